@@ -1,4 +1,5 @@
 # 2048_v5.py — 2048 for Pico + SSD1306 (portrait 64x128)
+# manifest: title=2048
 #
 # Change vs v4:
 # - 4-digit tiles (1024/2048) now use a special ultra-narrow 2x5 digit font,
@@ -9,30 +10,22 @@
 # 4 digits : 2x5 narrow digits (spacing=0)
 #
 # Wiring / buttons:
-#   OLED I2C0: SCL=21, SDA=20
+#   OLED: see hwconfig.py (default I2C0: SCL=21, SDA=20)
 #   UP=19, DOWN=18, RIGHT=16, LEFT=17 (active LOW, PULL_UP)
 
-from machine import Pin, I2C
-import ssd1306
+import gamectx
 import time
 import random
-import sys
 
-time.sleep(0.15)
-
-i2c = I2C(0, scl=Pin(21), sda=Pin(20))
-oled = ssd1306.SSD1306_I2C(128, 64, i2c)
-
-btn_up    = Pin(19, Pin.IN, Pin.PULL_UP)
-btn_down  = Pin(18, Pin.IN, Pin.PULL_UP)
-btn_right = Pin(16, Pin.IN, Pin.PULL_UP)
-btn_left  = Pin(17, Pin.IN, Pin.PULL_UP)
+# Display and buttons come from the launcher: play_game() below, gamectx.py
+oled = None
+btn_up = btn_down = btn_right = btn_left = None
 
 W, H = 64, 128  # logical portrait coords
 
 def draw_pixel(x, y, c=1):
-    if 0 <= x < 64 and 0 <= y < 128:
-        oled.pixel(y, 63 - x, c)
+    # oled is the 64x128 portrait surface (ctx.screen(90)); framebuf clips
+    oled.pixel(x, y, c)
 
 def fill(c=0):
     oled.fill(c)
@@ -104,9 +97,7 @@ def draw_glyph3x5(ch, x, y, scale=1, c=1):
         bits = rows[ry]
         for rx in range(3):
             if (bits >> (2-rx)) & 1:
-                for sy in range(scale):
-                    for sx in range(scale):
-                        draw_pixel(x + rx*scale + sx, y + ry*scale + sy, c)
+                oled.fill_rect(x + rx*scale, y + ry*scale, scale, scale, c)
 
 def text_width_3x5(s, scale=1, spacing=1):
     if not s:
@@ -162,12 +153,7 @@ def draw_digits_2x5(s, x, y, spacing=0):
 
 # ---- UI primitives ----
 def draw_rect(x, y, w, h, c=1):
-    for i in range(w):
-        draw_pixel(x+i, y, c)
-        draw_pixel(x+i, y+h-1, c)
-    for j in range(h):
-        draw_pixel(x, y+j, c)
-        draw_pixel(x+w-1, y+j, c)
+    oled.rect(x, y, w, h, c)
 
 # ---- 2048 logic ----
 SIZE = 4
@@ -397,7 +383,7 @@ def main():
 
     while True:
         if not title_screen():
-            sys.exit()
+            return
 
         board = new_board()
         score = 0
@@ -430,17 +416,26 @@ def main():
                     won = True
                     draw_board(board, score, best_score)
                     if not win_screen(score):
-                        sys.exit()
+                        return
 
                 draw_board(board, score, best_score)
 
                 if not any_moves(board):
                     if not game_over_screen(score, best_score):
-                        sys.exit()
+                        return
                     break
 
                 time.sleep_ms(90)
 
             time.sleep_ms(20)
 
-main()
+def play_game(ctx):
+    global oled, btn_up, btn_down, btn_right, btn_left
+    oled = ctx.screen(90)
+    btn_up, btn_down = ctx.btn_up, ctx.btn_down
+    btn_right, btn_left = ctx.btn_right, ctx.btn_left
+    time.sleep(0.15)
+    main()
+
+if __name__ == "__main__":
+    gamectx.run(play_game)
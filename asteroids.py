@@ -1,8 +1,9 @@
 # asteroids.py - Classic Asteroids for Pico 2 W + 64x128 portrait OLED (SH1106 rotate=90)
+# manifest: title=Asteroids
 #
 # Matches your working game mappings:
-#   I2C(0): SCL=GP21, SDA=GP20
-#   OLED: sh1106.SH1106_I2C(128, 64, rotate=90)  -> 64x128 portrait
+#   Bus/pins: hwconfig.py (default I2C(0): SCL=GP21, SDA=GP20)
+#   OLED: SH1106 rotate=90  -> 64x128 portrait
 #   Buttons (PULL_UP, active LOW):
 #       UP=GP19, DOWN=GP18, RIGHT=GP16, LEFT=GP17
 #
@@ -21,23 +22,16 @@
 #
 # Tip: If you want hyperspace later, we can add "hold DOWN for 400ms" etc.
 
-from machine import Pin, I2C
-import sh1106
+import gamectx
+import pbm
 import framebuf
 import time
 import random
-import sys
-
-time.sleep(0.25)
 
 # --- Display / input (same style as your other games) ---
-i2c = I2C(0, scl=Pin(21), sda=Pin(20))
-oled = sh1106.SH1106_I2C(128, 64, i2c, rotate=90)  # portrait 64x128
-
-btn_up    = Pin(19, Pin.IN, Pin.PULL_UP)
-btn_down  = Pin(18, Pin.IN, Pin.PULL_UP)
-btn_right = Pin(16, Pin.IN, Pin.PULL_UP)
-btn_left  = Pin(17, Pin.IN, Pin.PULL_UP)
+# Display and buttons come from the launcher: play_game() below, gamectx.py
+oled = None
+btn_up = btn_down = btn_right = btn_left = None
 
 W, H = 64, 128
 
@@ -48,8 +42,10 @@ def wait_for_all_released():
     time.sleep_ms(60)
 
 def show_centered_sideways(lines):
-    fb = framebuf.FrameBuffer(bytearray(128 * 64 // 8), 128, 64, framebuf.MONO_HLSB)
-    fb.fill(0)
+    # Drawn in panel layout (landscape MONO_VLSB pages); load_panel() turns
+    # it into our portrait space with one block transpose, like blit_pbm()
+    panel = bytearray(128 * 64 // 8)
+    fb = framebuf.FrameBuffer(panel, 128, 64, framebuf.MONO_VLSB)
     line_h = 10
     total_h = len(lines) * line_h - 2
     y = (64 - total_h) // 2
@@ -61,40 +57,16 @@ def show_centered_sideways(lines):
         if x < 0: x = 0
         fb.text(t, x, y + i * line_h, 1)
 
-    rotated = bytearray(64 * 128 // 8)
-    fb_rot = framebuf.FrameBuffer(rotated, 64, 128, framebuf.MONO_HLSB)
-    fb_rot.fill(0)
-    # rotate 128x64 -> 64x128
-    for xx in range(128):
-        for yy in range(64):
-            if fb.pixel(xx, yy):
-                fb_rot.pixel(63 - yy, xx, 1)
-
-    oled.fill(0)
-    oled.blit(fb_rot, 0, 0)
+    oled.load_panel(panel)
     oled.show()
 
 def blit_pbm(filename):
-    with open(filename, "rb") as f:
-        if f.readline().strip() != b"P4":
-            raise ValueError("Not P4")
-        line = f.readline()
-        while line.startswith(b"#"):
-            line = f.readline()
-        w, h = [int(x) for x in line.split()]
-        data = bytearray(f.read())
-    fb = framebuf.FrameBuffer(data, w, h, framebuf.MONO_HLSB)
-
-    rotated = bytearray(64 * 128 // 8)
-    fb_rot = framebuf.FrameBuffer(rotated, 64, 128, framebuf.MONO_HLSB)
-    fb_rot.fill(0)
-    for xx in range(w):
-        for yy in range(h):
-            if fb.pixel(xx, yy):
-                fb_rot.pixel(63 - yy, xx, 1)
-
-    oled.fill(0)
-    oled.blit(fb_rot, 0, 0)
+    # 128x64 P4 splash, block-decoded in panel layout; load_panel() puts it
+    # into our portrait space (same picture as the old pixel-by-pixel rotate)
+    w, h, data = pbm.read_p4(filename)
+    panel = bytearray(128 * 64 // 8)
+    pbm.blit_p4(data, w, h, panel, 128, 64)
+    oled.load_panel(panel)
     oled.show()
 
 def show_title():
@@ -260,7 +232,7 @@ def play_once():
             break
         if not btn_down.value():
             time.sleep_ms(180)
-            sys.exit()
+            raise gamectx.GameExit
         time.sleep_ms(20)
 
     eb = EdgeButtons()
@@ -463,7 +435,16 @@ def main():
                 break
             if not btn_down.value():
                 time.sleep_ms(180)
-                sys.exit()
+                return
             time.sleep_ms(20)
 
-main()
+def play_game(ctx):
+    global oled, btn_up, btn_down, btn_right, btn_left
+    oled = ctx.screen(90)
+    btn_up, btn_down = ctx.btn_up, ctx.btn_down
+    btn_right, btn_left = ctx.btn_right, ctx.btn_left
+    time.sleep(0.25)
+    main()
+
+if __name__ == "__main__":
+    gamectx.run(play_game, "sh1106")
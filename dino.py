@@ -1,44 +1,20 @@
-from machine import Pin, I2C
-from ssd1306 import SSD1306_I2C
-import framebuf
+# manifest: title=Dino Run
+import gamectx
 import time
 import urandom
 
 # ---------- Hardware ----------
-I2C_ADDR = 0x3C
-i2c = I2C(0, scl=Pin(21), sda=Pin(20), freq=400000)
-oled = SSD1306_I2C(128, 64, i2c, addr=I2C_ADDR)
-
-btn_left  = Pin(17, Pin.IN, Pin.PULL_UP)
-btn_right = Pin(16, Pin.IN, Pin.PULL_UP)
-btn_up    = Pin(19, Pin.IN, Pin.PULL_UP)
-btn_down  = Pin(18, Pin.IN, Pin.PULL_UP)
+# Display and buttons come from the launcher: play_game() below, gamectx.py
+oled = None
+btn_left = btn_right = btn_up = btn_down = None
 
 def pressed(pin):
     return pin.value() == 0  # active-low
 
-# ---------- Virtual portrait screen (64x128) ----------
+# ---------- Portrait screen (64x128) ----------
+# oled is the launcher's panel turned to portrait (ctx.screen(90)): the game
+# draws straight into it and oled.show() transposes it block by block
 VW, VH = 64, 128
-vbuf_bytes = bytearray(VW * (VH // 8))
-vbuf = framebuf.FrameBuffer(vbuf_bytes, VW, VH, framebuf.MONO_VLSB)
-
-# Rotation: X = y, Y = (VW-1-x)  (90° clockwise)
-def show_virtual():
-    oled.fill(0)
-    obuf = oled.buffer
-    ow = 128
-
-    for y in range(VH):
-        row_base = (y >> 3) * VW
-        bitmask = 1 << (y & 7)
-        for x in range(VW):
-            if vbuf_bytes[row_base + x] & bitmask:
-                X = y
-                Y = (VW - 1 - x)
-                idx = X + (Y >> 3) * ow
-                obuf[idx] |= (1 << (Y & 7))
-
-    oled.show()
 
 # ---------- Helpers ----------
 def clamp(v, lo, hi):
@@ -48,7 +24,7 @@ def clamp(v, lo, hi):
 
 def draw_text_center(y, text):
     x = max(0, (VW - len(text) * 8) // 2)
-    vbuf.text(text, x, y, 1)
+    oled.text(text, x, y, 1)
 
 def rects_overlap(a, b):
     ax, ay, aw, ah = a
@@ -98,19 +74,19 @@ BIRD_SCORE_START = 180
 # ---------- Sprites ----------
 def draw_dino(x, y, ducking=False):
     if ducking:
-        vbuf.fill_rect(x+1, y+6, 10, 4, 1)  # body
-        vbuf.fill_rect(x+8, y+5,  5, 3, 1)  # head
-        vbuf.pixel(x+12, y+6, 1)            # snout
-        vbuf.fill_rect(x+2, y+10, 3, 2, 1)
-        vbuf.fill_rect(x+6, y+10, 3, 2, 1)
+        oled.fill_rect(x+1, y+6, 10, 4, 1)  # body
+        oled.fill_rect(x+8, y+5,  5, 3, 1)  # head
+        oled.pixel(x+12, y+6, 1)            # snout
+        oled.fill_rect(x+2, y+10, 3, 2, 1)
+        oled.fill_rect(x+6, y+10, 3, 2, 1)
     else:
-        vbuf.fill_rect(x+2, y+7,  8, 8, 1)  # body
-        vbuf.fill_rect(x+8, y+4,  6, 4, 1)  # head
-        vbuf.pixel(x+13, y+6, 1)
-        vbuf.fill_rect(x+3, y+15, 2, 3, 1)
-        vbuf.fill_rect(x+6, y+15, 2, 3, 1)
-        vbuf.pixel(x+1, y+10, 1)
-        vbuf.pixel(x,   y+11, 1)
+        oled.fill_rect(x+2, y+7,  8, 8, 1)  # body
+        oled.fill_rect(x+8, y+4,  6, 4, 1)  # head
+        oled.pixel(x+13, y+6, 1)
+        oled.fill_rect(x+3, y+15, 2, 3, 1)
+        oled.fill_rect(x+6, y+15, 2, 3, 1)
+        oled.pixel(x+1, y+10, 1)
+        oled.pixel(x,   y+11, 1)
 
 def dino_hitbox(x, y, ducking=False):
     if ducking:
@@ -119,49 +95,49 @@ def dino_hitbox(x, y, ducking=False):
 
 def draw_cactus(x, base_y, variant=0):
     if variant == 0:
-        vbuf.fill_rect(x,   base_y-10, 3, 10, 1)
-        vbuf.fill_rect(x-2, base_y-8,  2, 2,  1)
-        vbuf.fill_rect(x+3, base_y-6,  2, 2,  1)
+        oled.fill_rect(x,   base_y-10, 3, 10, 1)
+        oled.fill_rect(x-2, base_y-8,  2, 2,  1)
+        oled.fill_rect(x+3, base_y-6,  2, 2,  1)
         return (x-2, base_y-10, 7, 10)
     elif variant == 1:
-        vbuf.fill_rect(x,   base_y-14, 4, 14, 1)
-        vbuf.fill_rect(x-3, base_y-10, 3, 3,  1)
-        vbuf.fill_rect(x+4, base_y-8,  3, 3,  1)
+        oled.fill_rect(x,   base_y-14, 4, 14, 1)
+        oled.fill_rect(x-3, base_y-10, 3, 3,  1)
+        oled.fill_rect(x+4, base_y-8,  3, 3,  1)
         return (x-3, base_y-14, 10, 14)
     else:
-        vbuf.fill_rect(x,   base_y-9,  2, 9,  1)
-        vbuf.fill_rect(x+3, base_y-12, 2, 12, 1)
-        vbuf.fill_rect(x+6, base_y-10, 2, 10, 1)
+        oled.fill_rect(x,   base_y-9,  2, 9,  1)
+        oled.fill_rect(x+3, base_y-12, 2, 12, 1)
+        oled.fill_rect(x+6, base_y-10, 2, 10, 1)
         return (x, base_y-12, 8, 12)
 
 def draw_ptero(x, y, flap=0):
     # “M” style wings, closer to Chrome vibe than a V
     if flap == 0:
-        vbuf.pixel(x,   y+2, 1)
-        vbuf.pixel(x+1, y+1, 1)
-        vbuf.pixel(x+2, y,   1)
-        vbuf.pixel(x+3, y+1, 1)
-        vbuf.pixel(x+4, y+2, 1)
-        vbuf.pixel(x+5, y+1, 1)
-        vbuf.pixel(x+6, y,   1)
-        vbuf.pixel(x+7, y+1, 1)
-        vbuf.pixel(x+8, y+2, 1)
+        oled.pixel(x,   y+2, 1)
+        oled.pixel(x+1, y+1, 1)
+        oled.pixel(x+2, y,   1)
+        oled.pixel(x+3, y+1, 1)
+        oled.pixel(x+4, y+2, 1)
+        oled.pixel(x+5, y+1, 1)
+        oled.pixel(x+6, y,   1)
+        oled.pixel(x+7, y+1, 1)
+        oled.pixel(x+8, y+2, 1)
     else:
-        vbuf.pixel(x,   y+1, 1)
-        vbuf.pixel(x+1, y,   1)
-        vbuf.pixel(x+2, y+1, 1)
-        vbuf.pixel(x+3, y,   1)
-        vbuf.pixel(x+4, y+1, 1)
-        vbuf.pixel(x+5, y,   1)
-        vbuf.pixel(x+6, y+1, 1)
-        vbuf.pixel(x+7, y,   1)
-        vbuf.pixel(x+8, y+1, 1)
-
-    vbuf.pixel(x+4, y+2, 1)  # body
+        oled.pixel(x,   y+1, 1)
+        oled.pixel(x+1, y,   1)
+        oled.pixel(x+2, y+1, 1)
+        oled.pixel(x+3, y,   1)
+        oled.pixel(x+4, y+1, 1)
+        oled.pixel(x+5, y,   1)
+        oled.pixel(x+6, y+1, 1)
+        oled.pixel(x+7, y,   1)
+        oled.pixel(x+8, y+1, 1)
+
+    oled.pixel(x+4, y+2, 1)  # body
     return (x, y, 9, 3)
 
 def ground_dash(x, y, w):
-    vbuf.fill_rect(x, y, w, 1, 1)
+    oled.fill_rect(x, y, w, 1, 1)
 
 # ---------- Obstacles ----------
 class Obstacle:
@@ -189,14 +165,19 @@ class Obstacle:
         return draw_ptero(int(self.x), int(self.y), self.flap)
 
 # ---------- Game ----------
-def play_game():
+def play_game(ctx):
+    global oled, btn_left, btn_right, btn_up, btn_down
+    oled = ctx.screen(90)
+    btn_left, btn_right = ctx.btn_left, ctx.btn_right
+    btn_up, btn_down = ctx.btn_up, ctx.btn_down
+
     # Title screen
     while True:
-        vbuf.fill(0)
+        oled.fill(0)
         draw_text_center(14, "DINO RUN")
         draw_text_center(38, "UP START")
         draw_text_center(50, "DN MENU")
-        show_virtual()
+        oled.show()
 
         if pressed(btn_up):
             time.sleep(0.2)
@@ -331,7 +312,7 @@ def play_game():
         obstacles = [o for o in obstacles if o.x > -20]
 
         # Draw
-        vbuf.fill(0)
+        oled.fill(0)
 
         # Ground dashes
         for x in range(0, VW, 6):
@@ -351,8 +332,8 @@ def play_game():
                 hit = True
 
         # Score (top-left in portrait)
-        vbuf.text(str(score), 0, 0, 1)
-        show_virtual()
+        oled.text(str(score), 0, 0, 1)
+        oled.show()
 
         # Game over
         if hit:
@@ -360,13 +341,13 @@ def play_game():
                 best = score
 
             while True:
-                vbuf.fill(0)
+                oled.fill(0)
                 draw_text_center(24, "GAME OVER")
                 draw_text_center(44, "SCORE " + str(score))
                 draw_text_center(56, "BEST  " + str(best))
                 draw_text_center(96, "UP AGAIN")
                 draw_text_center(108, "DN MENU")
-                show_virtual()
+                oled.show()
 
                 if pressed(btn_up):
                     time.sleep(0.2)
@@ -380,3 +361,6 @@ def play_game():
         # Score increments like Chrome (time survived)
         score += 1
         time.sleep(0.028)
+
+if __name__ == "__main__":
+    gamectx.run(play_game)
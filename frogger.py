@@ -1,6 +1,7 @@
 # frogger_fixed_v3.py - Vertical Frogger for Pico + SH1106 rotated portrait
+# manifest: title=Frogger
 # Hardware mapping matches your working SH1106 games:
-# - I2C(0) on GP21/GP20
+# - I2C(0) on GP21/GP20 (or SPI, see hwconfig.py)
 # - SH1106 rotate=90 (portrait coordinate space is 64x128)
 # - Buttons PULL_UP (active LOW): UP=GP19, DOWN=GP18, RIGHT=GP16, LEFT=GP17
 #
@@ -9,24 +10,18 @@
 # - Game Over screen is rendered "sideways" (landscape layout) so text fits nicely
 # - Score is shown on Game Over screen
 
-from machine import Pin, I2C
-import sh1106
+import gamectx
+import pbm
 import framebuf
 import time
 import random
-import sys
 
 # ----------------------------
 # Hardware init
 # ----------------------------
-time.sleep(0.3)
-i2c = I2C(0, scl=Pin(21), sda=Pin(20))
-oled = sh1106.SH1106_I2C(128, 64, i2c, rotate=90)  # portrait coords: 64x128
-
-btn_up    = Pin(19, Pin.IN, Pin.PULL_UP)
-btn_down  = Pin(18, Pin.IN, Pin.PULL_UP)
-btn_right = Pin(16, Pin.IN, Pin.PULL_UP)
-btn_left  = Pin(17, Pin.IN, Pin.PULL_UP)
+# Display and buttons come from the launcher: play_game() below, gamectx.py
+oled = None
+btn_up = btn_down = btn_right = btn_left = None
 
 # ----------------------------
 # Game constants (portrait world)
@@ -143,12 +138,14 @@ def show_centered_portrait(lines):
     oled.show()
 
 # ----------------------------
-# Landscape text screen rendered sideways (128x64 -> rotate into 64x128)
+# Landscape text screen rendered sideways (128x64 panel layout -> 64x128)
 # Use for Game Over so long lines fit (16 chars wide).
 # ----------------------------
 def show_centered_sideways(lines):
-    fb = framebuf.FrameBuffer(bytearray(128 * 64 // 8), 128, 64, framebuf.MONO_HLSB)
-    fb.fill(0)
+    # Drawn in panel layout (landscape MONO_VLSB pages); load_panel() turns
+    # it into our portrait space with one block transpose, like blit_pbm()
+    panel = bytearray(128 * 64 // 8)
+    fb = framebuf.FrameBuffer(panel, 128, 64, framebuf.MONO_VLSB)
 
     line_h = 10
     total_h = len(lines) * line_h - 2
@@ -166,18 +163,7 @@ def show_centered_sideways(lines):
             x = 0
         fb.text(t, x, y + i * line_h, 1)
 
-    rotated = bytearray(64 * 128 // 8)
-    fb_rot = framebuf.FrameBuffer(rotated, 64, 128, framebuf.MONO_HLSB)
-    fb_rot.fill(0)
-
-    # Rotate the 128x64 landscape buffer into our 64x128 portrait space
-    for xx in range(128):
-        for yy in range(64):
-            if fb.pixel(xx, yy):
-                fb_rot.pixel(63 - yy, xx, 1)
-
-    oled.fill(0)
-    oled.blit(fb_rot, 0, 0)
+    oled.load_panel(panel)
     oled.show()
 
 # ----------------------------
@@ -185,31 +171,12 @@ def show_centered_sideways(lines):
 # Rotated into 64x128 for our portrait world.
 # ----------------------------
 def blit_pbm(filename):
-    with open(filename, "rb") as f:
-        if f.readline().strip() != b"P4":
-            raise ValueError("Not a P4 PBM")
-
-        line = f.readline()
-        while line.startswith(b"#"):
-            line = f.readline()
-
-        parts = line.split()
-        w = int(parts[0]); h = int(parts[1])
-        data = bytearray(f.read())
-
-    fb = framebuf.FrameBuffer(data, w, h, framebuf.MONO_HLSB)
-
-    rotated = bytearray(64 * 128 // 8)
-    fb_rot = framebuf.FrameBuffer(rotated, 64, 128, framebuf.MONO_HLSB)
-    fb_rot.fill(0)
-
-    for xx in range(w):
-        for yy in range(h):
-            if fb.pixel(xx, yy):
-                fb_rot.pixel(63 - yy, xx, 1)
-
-    oled.fill(0)
-    oled.blit(fb_rot, 0, 0)
+    # 128x64 P4 splash, block-decoded in panel layout; load_panel() puts it
+    # into our portrait space (same picture as the old pixel-by-pixel rotate)
+    w, h, data = pbm.read_p4(filename)
+    panel = bytearray(128 * 64 // 8)
+    pbm.blit_p4(data, w, h, panel, 128, 64)
+    oled.load_panel(panel)
     oled.show()
 
 def show_splash():
@@ -423,7 +390,7 @@ def play_once():
             break
         if not btn_down.value():
             time.sleep_ms(180)
-            sys.exit()
+            raise gamectx.GameExit
         time.sleep_ms(20)
 
     level = 1
@@ -535,11 +502,17 @@ def play_once():
             return True
         if not btn_down.value():
             time.sleep_ms(180)
-            sys.exit()
+            raise gamectx.GameExit
         time.sleep_ms(20)
 
-# ----------------------------
-# Auto-run like your other games
-# ----------------------------
-while True:
-    play_once()
+def play_game(ctx):
+    global oled, btn_up, btn_down, btn_right, btn_left
+    oled = ctx.screen(90)
+    btn_up, btn_down = ctx.btn_up, ctx.btn_down
+    btn_right, btn_left = ctx.btn_right, ctx.btn_left
+    time.sleep(0.3)
+    while True:
+        play_once()
+
+if __name__ == "__main__":
+    gamectx.run(play_game, "sh1106")
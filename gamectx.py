@@ -0,0 +1,96 @@
+# gamectx.py
+# Plugin protocol between main.py and the games.
+#
+# A game module does nothing when imported (no display, no Pins, no loop at
+# module level) and defines
+#
+#     def play_game(ctx):
+#
+# main.py imports it, calls play_game() with the hardware it already set up
+# and gets control back when it returns. A game can also quit from anywhere
+# by raising GameExit (where the games used to call sys.exit()).
+#
+#   ctx.display           the launcher's panel driver, initialized once at boot
+#   ctx.screen(rotation)  the same panel with a 0/90/270 drawing surface
+#                         (90 = the 64x128 portrait surface)
+#   ctx.input             inputq.Input: debounced, timestamped button events
+#   ctx.btn_up / btn_down / btn_left / btn_right   Pin look-alikes on top of
+#                         it (value() 0 = pressed; short taps are not lost)
+#   ctx.clock             ticks_ms/ticks_diff/sleep_ms + frame() pacing
+#
+# A game file run on its own (mpremote run, or copied to main.py) ends with
+#     if __name__ == "__main__":
+#         gamectx.run(play_game, "sh1106")
+# which opens the display and buttons from hwconfig like the launcher does.
+
+import hwconfig
+import inputq
+
+try:
+    from time import ticks_ms, ticks_diff, ticks_add, sleep_ms
+except ImportError:
+    from time import monotonic as _mono, sleep as _sleep
+
+    def ticks_ms():
+        return int(_mono() * 1000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+    def ticks_add(a, b):
+        return a + b
+
+    def sleep_ms(ms):
+        _sleep(ms / 1000)
+
+
+class GameExit(Exception):
+    # Back to the launcher (or the end of run()) from anywhere in a game
+    pass
+
+
+class Clock:
+    def __init__(self):
+        self.ticks_ms = ticks_ms
+        self.ticks_diff = ticks_diff
+        self.sleep_ms = sleep_ms
+        self._next = ticks_ms()
+
+    def frame(self, ms):
+        # Sleep until ms after the previous frame() (fixed frame rate, drawing
+        # time included); a frame that ran late restarts the schedule
+        self._next = ticks_add(self._next, ms)
+        left = ticks_diff(self._next, ticks_ms())
+        if left > 0:
+            sleep_ms(left)
+        else:
+            self._next = ticks_ms()
+
+
+class GameContext:
+    def __init__(self, display, pins=None):
+        self.display = display
+        if pins is None:
+            pins = hwconfig.open_buttons()
+        self.input = inputq.Input(pins)
+        self.btn_up, self.btn_down, self.btn_left, self.btn_right = self.input.buttons
+        self.clock = Clock()
+
+    def screen(self, rotation=0):
+        self.display.set_rotation(rotation)
+        return self.display
+
+    def release(self):
+        # Launcher side, after play_game(): undo what the game may have left
+        # on the panel (rotation, async flushing, invert) and resend it all;
+        # button events the game did not take are dropped
+        self.display.restore()
+        self.input.clear()
+
+
+def run(play_game, controller="ssd1306"):
+    ctx = GameContext(hwconfig.open_display(controller, warm=False))
+    try:
+        play_game(ctx)
+    except GameExit:
+        pass
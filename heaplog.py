@@ -0,0 +1,144 @@
+# heaplog.py
+# Heap use of each game: free / allocated bytes and the largest free block
+# before launch, the peak while it runs, and what is left after it exits
+# (module torn down, gc.collect() done).
+#
+#   log = HeapLog()
+#   log.before(name, display)   # collect, snapshot, start sampling the peak
+#   ... play ...
+#   log.after(name)             # collect, snapshot, append to the history
+#   log.report()
+#
+# The peak is sampled on every show()/show_region()/present() of the display
+# (every game flushes once per frame), through instance wrappers like
+# OLEDCore.enable_stats(); they are removed again in after().
+#
+# largest_block() finds the biggest single allocation that still succeeds by
+# bisecting bytearray sizes (micropython.mem_info() only prints its heap map,
+# it cannot be read back). frag = 1 - largest block / free: 0 is one
+# contiguous free area, close to 1 means plenty free but only in small pieces.
+# A game whose "after" allocation keeps growing across runs leaks.
+
+import gc
+
+try:
+    from gc import mem_alloc, mem_free
+except ImportError:  # CPython: nothing to measure
+    def mem_alloc():
+        return 0
+
+    def mem_free():
+        return 0
+
+HISTORY = 8  # runs kept per game
+GRAIN = 16   # MicroPython heap block size
+
+
+def largest_block():
+    lo = 0
+    hi = mem_free() // GRAIN
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        try:
+            b = bytearray(mid * GRAIN)
+            b = None
+            lo = mid
+        except MemoryError:
+            hi = mid - 1
+    return lo * GRAIN
+
+
+def snapshot():
+    gc.collect()
+    free = mem_free()
+    block = largest_block()
+    return {"free": free, "alloc": mem_alloc(), "block": block,
+            "frag": 1 - block / free if free else 0.0}
+
+
+class HeapLog:
+    _WATCHED = ("show", "show_region", "present")
+
+    def __init__(self, history=HISTORY):
+        self.history = history
+        self.runs = {}   # name -> [{"before": snap, "peak": bytes, "after": snap}, ...]
+        self._run = None
+        self._display = None
+        self._saved = ()
+
+    def before(self, name, display=None):
+        run = {"before": snapshot(), "peak": mem_alloc(), "after": None}
+        self._run = run
+        if display is not None:
+            self._watch(display)
+        return run["before"]
+
+    def _watch(self, display):
+        # Fixed-signature wrappers, like OLEDCore.enable_stats(): no *args /
+        # **kw tuple or dict per frame, so the flush path stays allocation-free
+        # and the peak is not inflated by the sampling itself
+        run = self._run
+        own = getattr(display, "__dict__", {})
+        self._saved = [(name, own.get(name)) for name in self._WATCHED]
+        show = display.show
+        show_region = display.show_region
+        present = display.present
+
+        def peak():
+            a = mem_alloc()
+            if a > run["peak"]:
+                run["peak"] = a
+
+        def sampled_show(force=False):
+            show(force)
+            peak()
+
+        def sampled_region(x, y, w, h):
+            show_region(x, y, w, h)
+            peak()
+
+        def sampled_present(force=False):
+            r = present(force)
+            peak()
+            return r
+
+        display.show = sampled_show
+        display.show_region = sampled_region
+        display.present = sampled_present
+        self._display = display
+
+    def _unwatch(self):
+        display = self._display
+        for name, orig in self._saved:
+            if orig is None:
+                delattr(display, name)
+            else:
+                setattr(display, name, orig)
+        self._display = None
+        self._saved = ()
+
+    def after(self, name):
+        run = self._run
+        if run is None:
+            return None
+        if self._display is not None:
+            self._unwatch()
+        self._run = None
+        run["after"] = snapshot()
+        runs = self.runs.setdefault(name, [])
+        runs.append(run)
+        if len(runs) > self.history:
+            runs.pop(0)
+        return run
+
+    def line(self, name, run):
+        b = run["before"]
+        a = run["after"]
+        return "%-12s free %6d->%6d  peak %6d  leak %+6d  block %6d->%6d  frag %.2f->%.2f" % (
+            name, b["free"], a["free"], run["peak"] - b["alloc"], a["alloc"] - b["alloc"],
+            b["block"], a["block"], b["frag"], a["frag"])
+
+    def report(self):
+        for name in sorted(self.runs):
+            for run in self.runs[name]:
+                print(self.line(name, run))
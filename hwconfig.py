@@ -0,0 +1,99 @@
+# hwconfig.py - board wiring shared by main.py and every game
+# Edit this file once instead of the I2C(...) line in each game.
+#
+#   BUS = "i2c": I2C(0) on SCL=GP21, SDA=GP20 (default wiring); the rate is
+#                auto-tuned and remembered in flash, or fixed at I2C_FREQ
+#   BUS = "spi": SPI(0) on SCK=GP2, MOSI=GP3, DC=GP4, CS=GP5, RES=GP6
+#                (buttons stay on GP16-19)
+#
+# Games launched from main.py share its display (gamectx.py); a game started
+# on its own asks for the controller it was written for ("ssd1306" / "sh1106").
+# CONTROLLER forces one driver for all of them when the board has a single panel type.
+
+from machine import Pin
+
+BUS = "i2c"        # "i2c" or "spi"
+CONTROLLER = None  # None = each game's choice, or "ssd1306" / "sh1106"
+
+WIDTH = 128
+HEIGHT = 64
+
+I2C_ID = 0
+I2C_SCL = 21
+I2C_SDA = 20
+I2C_FREQ = 400000  # fixed rate when I2C_TUNE is off
+I2C_TUNE = True    # probe 400k/800k/1M once, keep the result (i2ctune.py)
+I2C_ADDR = 0x3C
+GAME_I2C_FREQ = 0  # per-game rate from the manifest, set by retune() (0 = as above)
+
+SPI_ID = 0
+SPI_SCK = 2
+SPI_MOSI = 3
+SPI_DC = 4
+SPI_CS = 5
+SPI_RES = 6
+SPI_BAUD = 10000000
+
+# Buttons: active LOW, internal pull-ups
+BTN_UP = 19
+BTN_DOWN = 18
+BTN_RIGHT = 16
+BTN_LEFT = 17
+
+
+def make_i2c(freq):
+    from machine import I2C
+    return I2C(I2C_ID, scl=Pin(I2C_SCL), sda=Pin(I2C_SDA), freq=freq)
+
+
+def open_bus():
+    if BUS == "spi":
+        from machine import SPI
+        return SPI(SPI_ID, baudrate=SPI_BAUD, polarity=0, phase=0,
+                   sck=Pin(SPI_SCK), mosi=Pin(SPI_MOSI))
+    if I2C_TUNE:
+        import i2ctune
+        bus = i2ctune.open_tuned(make_i2c, I2C_ADDR)
+        if GAME_I2C_FREQ:
+            bus.set_rate(GAME_I2C_FREQ)
+        return bus
+    return make_i2c(GAME_I2C_FREQ or I2C_FREQ)
+
+
+def retune(display, freq=0):
+    # Move a live I2C display to freq for one game (0 = back to the tuned /
+    # fixed rate). SPI is left alone.
+    global GAME_I2C_FREQ
+    GAME_I2C_FREQ = freq
+    if BUS != "i2c":
+        return
+    bus = display.i2c
+    if hasattr(bus, "set_rate"):
+        bus.set_rate(freq)  # i2ctune.TunedI2C: keeps its fallback and profile
+    else:
+        display.i2c = make_i2c(freq or I2C_FREQ)
+
+
+def open_buttons():
+    # (up, down, left, right)
+    return (Pin(BTN_UP, Pin.IN, Pin.PULL_UP), Pin(BTN_DOWN, Pin.IN, Pin.PULL_UP),
+            Pin(BTN_LEFT, Pin.IN, Pin.PULL_UP), Pin(BTN_RIGHT, Pin.IN, Pin.PULL_UP))
+
+
+def open_display(controller="ssd1306", rotation=0, warm=True):
+    # rotation=90 gives the portrait 64x128 surface the SH1106 games use.
+    # warm=True attaches without re-init when main.py already set the panel
+    # up (oledcore.mark_warm); a game started on its own still gets a cold init.
+    controller = CONTROLLER or controller
+    bus = open_bus()
+    if controller == "sh1106":
+        import sh1106
+        if BUS == "spi":
+            return sh1106.SH1106_SPI(WIDTH, HEIGHT, bus, Pin(SPI_DC), Pin(SPI_RES), Pin(SPI_CS),
+                                     rotate=rotation, warm=warm)
+        return sh1106.SH1106_I2C(WIDTH, HEIGHT, bus, addr=I2C_ADDR, rotate=rotation, warm=warm)
+    import ssd1306
+    if BUS == "spi":
+        return ssd1306.SSD1306_SPI(WIDTH, HEIGHT, bus, Pin(SPI_DC), Pin(SPI_RES), Pin(SPI_CS),
+                                   rotation=rotation, warm=warm)
+    return ssd1306.SSD1306_I2C(WIDTH, HEIGHT, bus, addr=I2C_ADDR, rotation=rotation, warm=warm)
@@ -0,0 +1,164 @@
+# i2ctune.py
+# I2C bus profile for the OLED: find the fastest rate the panel takes reliably,
+# remember it in flash, and step down by itself if errors show up later.
+#
+#   bus = i2ctune.open_tuned(make_bus)   # make_bus(freq) -> machine.I2C
+#
+# probe() walks RATES upwards with a fixed command + data pattern and stops at
+# the first rate that raises OSError or comes back short of ACKs (NACK). The
+# winner is written to PROFILE, so later boots just read it back. TunedI2C
+# wraps the bus and counts failed transactions: after STRIKES in a row it
+# rebuilds the bus one rate lower and rewrites PROFILE, so a one-off glitch
+# never lowers the stored rate. The error itself always goes back to the
+# driver: a transaction can fail after some bytes were ACKed, so only the
+# driver can re-address and resend it (OLEDCore.bus_retries, taken from
+# TunedI2C.retries).
+# set_rate() moves the wrapper to another rate for a while (a game's own
+# rate) without touching PROFILE. forget() drops the profile so the next boot
+# probes again.
+#
+# tests/fakebus.py (FakeI2C / FakeBusFactory) injects NACKs above a threshold
+# for host tests.
+
+RATES = (400000, 800000, 1000000)
+SAFE_RATE = 100000  # used when even RATES[0] fails
+STRIKES = 3  # failures in a row at one rate before stepping down
+PROFILE = "i2c_profile.txt"
+ADDR = 0x3C
+
+# NOPs, then page 0 / column 0 and one full 132-byte RAM page.
+# The display init scrubs the RAM afterwards, so the stripe never shows.
+_CMD = b"\x00\xe3\xe3\xe3\xe3\xb0\x00\x10"
+_DATA = b"\x40" + b"\x55\xaa" * 66
+
+
+def _pattern_ok(bus, addr, rounds):
+    # writeto() returns the number of ACKed bytes on most ports; the rp2 port
+    # raises OSError instead. Either way a short count is a NACK.
+    try:
+        for _ in range(rounds):
+            n = bus.writeto(addr, _CMD)
+            if n is not None and n != len(_CMD):
+                return False
+            n = bus.writeto(addr, _DATA)
+            if n is not None and n != len(_DATA):
+                return False
+    except OSError:
+        return False
+    return True
+
+
+def probe(make_bus, addr=ADDR, rates=RATES, rounds=8):
+    # Highest rate in rates (ascending) that passes the pattern; stops at the
+    # first failure. SAFE_RATE if none pass.
+    best = SAFE_RATE
+    for freq in rates:
+        if not _pattern_ok(make_bus(freq), addr, rounds):
+            break
+        best = freq
+    return best
+
+
+def load(path=PROFILE):
+    try:
+        with open(path) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def save(freq, path=PROFILE):
+    # A read-only filesystem just means probing again next boot
+    try:
+        with open(path, "w") as f:
+            f.write(str(freq))
+    except OSError:
+        pass
+
+
+def forget(path=PROFILE):
+    import os
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class TunedI2C:
+    # Drop-in for the machine.I2C the drivers use (writeto/writevto). An
+    # OSError is counted and re-raised; STRIKES in a row rebuild the bus at
+    # the next lower rate (down to SAFE_RATE).
+    def __init__(self, make_bus, freq, rates=RATES, path=PROFILE):
+        self._make_bus = make_bus
+        self._rates = rates
+        self._path = path
+        self.freq = freq
+        self.tuned = freq    # rate set_rate(0) returns to
+        self._pinned = False # running at a set_rate() rate: nothing is saved
+        self.fallbacks = 0
+        self.errors = 0      # failed transactions
+        self._strikes = 0    # failures in a row at the current rate
+        # failures in a row worth resending: enough to step all the way
+        # down and strike out at SAFE_RATE
+        self.retries = STRIKES * (len(rates) + 1)
+        self.bus = make_bus(freq)
+
+    def _failed(self, err):
+        self.errors += 1
+        self._strikes += 1
+        if self._strikes >= STRIKES and self.freq > SAFE_RATE:
+            self._strikes = 0
+            self._step_down()
+
+    def _step_down(self):
+        lower = SAFE_RATE
+        for freq in self._rates:
+            if lower < freq < self.freq:
+                lower = freq
+        self.freq = lower
+        self.bus = self._make_bus(lower)
+        self.fallbacks += 1
+        if not self._pinned:
+            self.tuned = lower
+            save(lower, self._path)
+
+    def set_rate(self, freq=0):
+        # Rebuild the bus at freq, keeping the wrapper (and its fallback);
+        # 0 = back to the tuned rate
+        self._pinned = bool(freq)
+        freq = freq or self.tuned
+        if freq != self.freq:
+            self.freq = freq
+            self.bus = self._make_bus(freq)
+        self._strikes = 0
+
+    def writeto(self, addr, buf, stop=True):
+        try:
+            n = self.bus.writeto(addr, buf, stop)
+        except OSError as e:
+            self._failed(e)
+            raise
+        self._strikes = 0
+        return n
+
+    def writevto(self, addr, vec, stop=True):
+        try:
+            n = self.bus.writevto(addr, vec, stop)
+        except OSError as e:
+            self._failed(e)
+            raise
+        self._strikes = 0
+        return n
+
+    def __getattr__(self, name):
+        # scan(), readfrom_into(), ... go straight to the current bus
+        return getattr(self.bus, name)
+
+
+def open_tuned(make_bus, addr=ADDR, rates=RATES, path=PROFILE):
+    # Stored profile if there is one, otherwise probe once and store it
+    freq = load(path)
+    if freq is None:
+        freq = probe(make_bus, addr, rates)
+        save(freq, path)
+    return TunedI2C(make_bus, freq, rates, path)
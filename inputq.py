@@ -0,0 +1,149 @@
+# inputq.py
+# The four buttons as a queue of timestamped events instead of Pin.value()
+# polling with sleeps for debounce.
+#
+#   inp = Input(hwconfig.open_buttons())   # (up, down, left, right), active low
+#   ev = inp.get()                         # -1 when nothing happened
+#   if ev >= 0 and is_press(ev) and button(ev) == RIGHT: ...
+#
+# Each pin gets an IRQ on both edges. The handler timestamps the edge with
+# ticks_us, drops it if it comes within debounce_us of the last accepted edge
+# of that button (contact bounce), and pushes an event into a preallocated ring
+# of SIZE ints: no allocation in the handler. An edge dropped as bounce is
+# picked up again by the next get()/value(), which compares the settled pin
+# level with the debounced state. Without Pin.irq (or irq=False) the same
+# check on every get()/value() is the whole input path (polling fallback).
+#
+# Event ints: ms timestamp (22 bits) << 3 | button << 1 | 1 for press.
+# Games that poll keep doing so through inp.buttons[i]: a Pin look-alike whose
+# value() is 0 while the button is held, and once more after a press that was
+# released before anyone looked (short taps are not lost between polls).
+#
+# tests/fakepin.py (FakePin) drives all of this on the host.
+
+from array import array
+
+try:
+    from time import ticks_us, ticks_ms, ticks_diff
+except ImportError:
+    from time import perf_counter as _perf
+
+    def ticks_us():
+        return int(_perf() * 1000000)
+
+    def ticks_ms():
+        return int(_perf() * 1000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+SIZE = 32
+DEBOUNCE_US = 8000
+MS_MASK = 0x3FFFFF
+
+
+def button(ev):
+    return (ev >> 1) & 3
+
+
+def is_press(ev):
+    return ev & 1
+
+
+def stamp_ms(ev):
+    # ticks_ms() & MS_MASK at the edge
+    return ev >> 3
+
+
+class Button:
+    # Pin stand-in handed to games: value() like an active-low Pin
+    def __init__(self, inp, i):
+        self._inp = inp
+        self._i = i
+
+    def value(self):
+        return self._inp.value(self._i)
+
+
+class Input:
+    def __init__(self, pins, size=SIZE, debounce_us=DEBOUNCE_US, irq=True):
+        self.pins = pins
+        self.debounce_us = debounce_us
+        self._ring = array("i", [0] * size)
+        self._size = size
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0             # events lost to a full ring
+        self._held = bytearray(4)    # debounced state, 1 = pressed
+        self._latch = bytearray(4)   # press not seen by value() yet
+        self._last = [0] * 4         # ticks_us of the last accepted edge
+        self._busy = 0               # main code inside _sample(): IRQ backs off
+        self.buttons = tuple(Button(self, i) for i in range(4))
+        self.irq = False
+        if irq:
+            try:
+                for i in range(4):
+                    p = pins[i]
+                    p.irq(handler=self._handler(i), trigger=p.IRQ_FALLING | p.IRQ_RISING)
+                self.irq = True
+            except (AttributeError, TypeError, ValueError):
+                pass
+
+    def _handler(self, i):
+        def edge(pin):
+            if not self._busy:
+                self._sample(i)
+        return edge
+
+    def _sample(self, i):
+        now = ticks_us()
+        held = 0 if self.pins[i].value() else 1
+        if held == self._held[i]:
+            return
+        d = ticks_diff(now, self._last[i])
+        if 0 <= d < self.debounce_us:  # negative: last edge too old to matter
+            return
+        self._last[i] = now
+        self._held[i] = held
+        if held:
+            self._latch[i] = 1
+        nxt = (self._head + 1) % self._size
+        if nxt == self._tail:
+            self.dropped += 1
+            return
+        self._ring[self._head] = ((ticks_ms() & MS_MASK) << 3) | (i << 1) | held
+        self._head = nxt
+
+    def _poll(self, i):
+        self._busy = 1
+        self._sample(i)
+        self._busy = 0
+
+    def get(self):
+        # Oldest event, or -1
+        for i in range(4):
+            self._poll(i)
+        if self._tail == self._head:
+            return -1
+        ev = self._ring[self._tail]
+        self._tail = (self._tail + 1) % self._size
+        return ev
+
+    def held(self, i):
+        self._poll(i)
+        return self._held[i]
+
+    def value(self, i):
+        # 0 = pressed (held, or pressed since the last look), 1 = released
+        self._poll(i)
+        if self._latch[i]:
+            self._latch[i] = 0
+            return 0
+        return 0 if self._held[i] else 1
+
+    def clear(self):
+        # Forget queued events and unseen presses (e.g. left over from a game)
+        self._tail = self._head
+        for i in range(4):
+            self._latch[i] = 0
@@ -1,4 +1,5 @@
 # klotski_v2.py — Klotski (Hua Rong Dao) for Pico + SSD1306 (portrait 64x128)
+# manifest: title=Klotski
 #
 # v2 changes:
 # - Adds 5 total puzzles (the original + 4 more).
@@ -20,28 +21,20 @@
 # Win condition:
 #   2x2 "Cao Cao" block reaches the bottom middle exit.
 
-from machine import Pin, I2C
-import ssd1306
+import gamectx
 import time
-import sys
-
-time.sleep(0.15)
 
 # ---- Hardware ----
-i2c = I2C(0, scl=Pin(21), sda=Pin(20))
-oled = ssd1306.SSD1306_I2C(128, 64, i2c)
-
-btn_up    = Pin(19, Pin.IN, Pin.PULL_UP)
-btn_down  = Pin(18, Pin.IN, Pin.PULL_UP)
-btn_right = Pin(16, Pin.IN, Pin.PULL_UP)
-btn_left  = Pin(17, Pin.IN, Pin.PULL_UP)
+# Display and buttons come from the launcher: play_game() below, gamectx.py
+oled = None
+btn_up = btn_down = btn_right = btn_left = None
 
 # Logical portrait space
 W, H = 64, 128
 
 def draw_pixel(x, y, c=1):
-    if 0 <= x < 64 and 0 <= y < 128:
-        oled.pixel(y, 63 - x, c)
+    # oled is the 64x128 portrait surface (ctx.screen(90)); framebuf clips
+    oled.pixel(x, y, c)
 
 def fill(c=0):
     oled.fill(c)
@@ -119,9 +112,7 @@ def draw_glyph(ch, x, y, scale=1, c=1):
         bits = rows[ry]
         for rx in range(3):
             if (bits >> (2-rx)) & 1:
-                for sy in range(scale):
-                    for sx in range(scale):
-                        draw_pixel(x + rx*scale + sx, y + ry*scale + sy, c)
+                oled.fill_rect(x + rx*scale, y + ry*scale, scale, scale, c)
 
 def text_width(s, scale=1, spacing=1):
     if not s:
@@ -142,25 +133,25 @@ def draw_text_center(s, y, scale=1):
 
 # ---- Drawing helpers ----
 def draw_rect(x, y, w, h, c=1):
-    for i in range(w):
-        draw_pixel(x+i, y, c)
-        draw_pixel(x+i, y+h-1, c)
-    for j in range(h):
-        draw_pixel(x, y+j, c)
-        draw_pixel(x+w-1, y+j, c)
+    oled.rect(x, y, w, h, c)
 
 def pattern_fill(x, y, w, h, pid):
+    # stripes as whole lines, the dotted patterns pixel by pixel
+    if pid in (2, 3):
+        for i in range(2, w-1, 2):
+            oled.vline(x+i, y+1, h-2, 1)
+        return
+    if pid in (5, 6):
+        for j in range(2, h-1, 2):
+            oled.hline(x+1, y+j, w-2, 1)
+        return
     for j in range(1, h-1):
         for i in range(1, w-1):
             v = 0
             if pid == 1:
                 v = ((i + j) % 2 == 0)
-            elif pid in (2, 3):
-                v = (i % 2 == 0)
             elif pid == 4:
                 v = ((i % 3 == 0) and (j % 2 == 0))
-            elif pid in (5, 6):
-                v = (j % 2 == 0)
             else:
                 v = ((i + pid) % 3 == 0) and ((j + pid) % 2 == 0)
             if v:
@@ -441,14 +432,14 @@ def main():
             draw_text_center("PUZZLE", 70, scale=2)
             show()
             time.sleep(2)
-            sys.exit()
+            return
 
     eb = EdgeButtons()
 
     while True:
         action, pidx = pick_puzzle()
         if action == "exit":
-            sys.exit()
+            return
 
         board = clone_board(PUZZLES[pidx])
         cur_r, cur_c = 4, 1
@@ -505,7 +496,7 @@ def main():
                         time.sleep_ms(150)
                         wact, new_pidx = win_menu(moves, pidx)
                         if wact == "exit":
-                            sys.exit()
+                            return
                         pidx = new_pidx
                         board = clone_board(PUZZLES[pidx])
                         cur_r, cur_c = 4, 1
@@ -516,4 +507,13 @@ def main():
 
             time.sleep_ms(35)
 
-main()
+def play_game(ctx):
+    global oled, btn_up, btn_down, btn_right, btn_left
+    oled = ctx.screen(90)
+    btn_up, btn_down = ctx.btn_up, ctx.btn_down
+    btn_right, btn_left = ctx.btn_right, ctx.btn_left
+    time.sleep(0.15)
+    main()
+
+if __name__ == "__main__":
+    gamectx.run(play_game)
@@ -1,104 +1,311 @@
-from machine import Pin, I2C
-from ssd1306 import SSD1306_I2C
+import hwconfig
+import oledcore
+from pbm import read_p4 as read_pbm_p4, blit_p4
+import framebuf
 import time
 import os
 import sys
+import gc
+import struct
+import machine
+import manifest
+import gamectx
+import mpycache
+import heaplog
+import inputq
 
 # =========================
 # === IMPOSTAZIONI BASE ===
 # =========================
-i2c = I2C(0, scl=Pin(21), sda=Pin(20), freq=400000)
-display = SSD1306_I2C(128, 64, i2c, addr=0x3C)
-
-# Pulsanti (active-low)
-btn_left  = Pin(17, Pin.IN, Pin.PULL_UP)
-btn_right = Pin(16, Pin.IN, Pin.PULL_UP)
-btn_up    = Pin(19, Pin.IN, Pin.PULL_UP)
-btn_down  = Pin(18, Pin.IN, Pin.PULL_UP)
+# FAST_BOOT: logo from the page blob (logo.bin), manifest / thumbnails /
+# bytecode stamps warmed while it is up, menu as soon as that is done.
+# False: logo decoded from logo.pbm, fixed 2 s wait, then the menu.
+FAST_BOOT = True
+
+# Boot timing, phase by phase, printed once the first menu frame is up
+boot_times = []   # (phase, us)
+boot_t = time.ticks_us()
+
+def boot_phase(name):
+    """Close the running boot phase under name and start the next one."""
+    global boot_t
+    now = time.ticks_us()
+    boot_times.append((name, time.ticks_diff(now, boot_t)))
+    boot_t = now
+
+def boot_split(name, us):
+    """Carve us spent inside the last phase out as its own entry."""
+    last, total = boot_times[-1]
+    boot_times[-1] = (last, total - us)
+    boot_times.append((name, us))
+
+def boot_report():
+    total = 0
+    parts = []
+    for name, us in boot_times:
+        total += us
+        parts.append("%s %d ms" % (name, us // 1000))
+    print("Boot:", ", ".join(parts), "| total %d ms" % (total // 1000))
+
+display = hwconfig.open_display("ssd1306")  # wiring: hwconfig.py
+oledcore.mark_warm(display)  # older games attach to the panel without re-init
+boot_phase("driver init")
+boot_split("RAM scrub", display.scrub_us)
+
+# Pulsanti: IRQ event queue (inputq.py), shared with the games through the context
+ctx = gamectx.GameContext(display)
+inp = ctx.input
+MENU_REPEAT_MS = 250  # LEFT/RIGHT held: next game every MENU_REPEAT_MS
 
 GAMES_FOLDER = "games"
 if GAMES_FOLDER not in sys.path:
     sys.path.append(GAMES_FOLDER)
+mpycache.use_cache(GAMES_FOLDER)  # games/.mpy bytecode first (mpycache.py)
 
 # =========================
 # === PBM (P4) LOADER =====
 # =========================
-def read_pbm_p4(path):
-    """Reads PBM P4 (raw). Returns (w, h, data_bytes)."""
-    with open(path, "rb") as f:
-        magic = f.readline().strip()
-        if magic != b"P4":
-            raise ValueError("Not P4 PBM")
-
-        tokens = []
-        while len(tokens) < 2:
-            line = f.readline()
-            if not line:
-                raise ValueError("PBM header EOF")
-            line = line.strip()
-            if (not line) or line.startswith(b"#"):
-                continue
-            tokens += line.split()
-
-        w = int(tokens[0])
-        h = int(tokens[1])
-        data = bytearray(f.read())
-
-    row_bytes = (w + 7) // 8
-    expected = row_bytes * h
-    if len(data) != expected:
-        raise ValueError("PBM bytes %d != %d" % (len(data), expected))
-
-    return w, h, data
-
-
-def draw_pbm_to_display(path, x0=0, y0=0):
+def render_pbm(path, buf, x0=0, y0=0):
     """
-    Draw PBM P4 onto SSD1306 display buffer (MONO_VLSB).
-    PBM P4 is MSB-first within each byte for each row.
+    Decode PBM P4 into buf, a MONO_VLSB page buffer shaped like display.buffer.
+    PBM P4 is MSB-first within each byte for each row; pbm.blit_p4 transposes
+    it 8x8 bits at a time (clipped at the edges).
     """
     w, h, pbm = read_pbm_p4(path)
 
-    max_w = min(w, display.width - x0)
-    max_h = min(h, display.height - y0)
+    fb = framebuf.FrameBuffer(buf, display.width, display.height, framebuf.MONO_VLSB)
+    fb.fill(0)
+    blit_p4(pbm, w, h, buf, display.width, display.height, x0, y0)
 
-    row_bytes = (w + 7) // 8
-    buf = display.buffer
-    dw = display.width
+    # --- Artifact killer: wipe the top row of the menu image ---
+    fb.fill_rect(0, 0, display.width, 1, 0)
 
-    display.fill(0)
 
-    for y in range(max_h):
-        row_start = y * row_bytes
-        for x in range(max_w):
-            b = pbm[row_start + (x >> 3)]
-            bit = 7 - (x & 7)          # PBM: MSB first
-            on = (b >> bit) & 1
+def draw_pbm_to_display(path, x0=0, y0=0):
+    """Draw PBM P4 onto SSD1306 display buffer (MONO_VLSB) and show it."""
+    render_pbm(path, display.buffer, x0, y0)
+    display.show()
 
-            if on:
-                dx = x0 + x
-                dy = y0 + y
-                idx = dx + (dy >> 3) * dw
-                buf[idx] |= (1 << (dy & 7))
+# =========================
+# === MANIFEST GIOCHI =====
+# =========================
+# games/manifest.json (manifest.py): title, thumbnail, entry point and
+# performance profile of each game, read in one pass at boot. The idle menu
+# rescans the folder once and rebuilds it (and the atlas) if anything changed.
+game_info = {}   # module -> manifest entry
+
+def use_manifest(man):
+    """Make man the current game list: fills game_info, syncs the atlas."""
+    game_info.clear()
+    for game in man["games"]:
+        game_info[game["module"]] = game
+    sync_atlas(man)
+    return [game["module"] for game in man["games"]]
+
+def thumb_path(name):
+    return "%s/%s" % (GAMES_FOLDER, game_info[name]["thumb"] or name + ".pbm")
 
-    # --- Artifact killer: wipe the top row of the menu image ---
-    display.fill_rect(0, 0, display.width, 1, 0)
+# =========================
+# === ATLANTE MINIATURE ===
+# =========================
+# Every menu entry in one file: header + index + page-format images (each
+# exactly display.buffer). An entry is shown with one seek + readinto on a
+# handle kept open for the life of the menu. Layout (little-endian):
+#   b"THA1", count u16, image size u16
+#   count x [name len u8, name, pbm size u32, pbm mtime u32, offset u32, length u16]
+#   images (length 0 = game without a usable PBM)
+# The index is checked against the games manifest (no folder scan) and the
+# atlas rebuilt when games or images changed.
+ATLAS_PATH = GAMES_FOLDER + "/.atlas"
+ATLAS_MAGIC = b"THA1"
+
+atlas_file = None
+atlas_index = {}   # name -> (pbm size, pbm mtime, offset, length)
+
+def thumb_keys(man):
+    """{module: (thumb size, thumb mtime)} from the manifest, (0, 0) if none."""
+    files = man["files"]
+    keys = {}
+    for game in man["games"]:
+        key = files.get(game["thumb"]) if game["thumb"] else None
+        keys[game["module"]] = tuple(key) if key else (0, 0)
+    return keys
+
+def close_atlas():
+    global atlas_file
+    if atlas_file is not None:
+        atlas_file.close()
+        atlas_file = None
+    atlas_index.clear()
+
+def open_atlas():
+    """Load the atlas index and keep the file open; menu order or None."""
+    global atlas_file
+    close_atlas()
+    try:
+        f = open(ATLAS_PATH, "rb")
+    except OSError:
+        return None
+    try:
+        head = f.read(8)
+        if len(head) != 8 or head[:4] != ATLAS_MAGIC:
+            raise ValueError("bad atlas")
+        count, size = struct.unpack("<HH", head[4:])
+        if size != len(display.buffer):
+            raise ValueError("atlas image size %d" % size)
+        names = []
+        for _ in range(count):
+            name = f.read(f.read(1)[0]).decode()
+            atlas_index[name] = struct.unpack("<IIIH", f.read(14))
+            names.append(name)
+    except Exception as e:
+        f.close()
+        atlas_index.clear()
+        print("Warning: atlante non valido:", e)
+        return None
+    atlas_file = f
+    return names
+
+def build_atlas(names, keys):
+    """Decode every entry once into a fresh atlas; returns open_atlas()."""
+    close_atlas()
+    size = len(display.buffer)
+    buf = bytearray(size)
+    head_len = 8
+    for name in names:
+        head_len += 1 + len(name) + 14
+    entries = []
+    tmp = ATLAS_PATH + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(bytes(head_len))  # index written last, once offsets are known
+        offset = head_len
+        for name in names:
+            length = 0
+            if keys[name][0]:
+                try:
+                    render_pbm(thumb_path(name), buf)
+                    f.write(buf)
+                    length = size
+                except Exception as e:
+                    print("Warning: immagine non trovata o invalida:", name, e)
+            entries.append((name, offset, length))
+            offset += length
+        f.seek(0)
+        f.write(ATLAS_MAGIC + struct.pack("<HH", len(names), size))
+        for name, offset, length in entries:
+            raw = name.encode()
+            f.write(bytes((len(raw),)) + raw)
+            f.write(struct.pack("<IIIH", keys[name][0], keys[name][1], offset, length))
+    try:
+        os.remove(ATLAS_PATH)
+    except OSError:
+        pass
+    os.rename(tmp, ATLAS_PATH)
+    return open_atlas()
+
+def sync_atlas(man):
+    """Open the atlas, rebuilding it if it does not match the manifest."""
+    names = [game["module"] for game in man["games"]]
+    keys = thumb_keys(man)
+    found = open_atlas()
+    if found != names or any(keys[n] != atlas_index[n][:2] for n in names):
+        build_atlas(names, keys)
+
+def atlas_read(name, buf):
+    """seek + readinto the entry's image into buf; False if it has none."""
+    entry = atlas_index.get(name)
+    if atlas_file is None or entry is None or not entry[3]:
+        return False
+    atlas_file.seek(entry[2])
+    return atlas_file.readinto(buf) == len(buf)
+
+def render_thumb(name, buf):
+    """Fill buf with the menu image for name: atlas, else decode the PBM."""
+    if not atlas_read(name, buf):
+        render_pbm(thumb_path(name), buf)
 
-    display.show()
+# =========================
+# === MINIATURE IN RAM ====
+# =========================
+# Decoded thumbnails kept in RAM, least recently used first. The idle menu
+# loop prefetches the neighbours of the current entry from the atlas, so
+# LEFT/RIGHT is just buffer[:] = cached + show(). Entries go when the byte budget is full (their
+# buffers are reused) or when gc.mem_free() drops below THUMB_MEM_LOW.
+THUMB_RAM_BUDGET = 8 * 1024   # bytes of decoded thumbnails (8 at 128x64)
+THUMB_MEM_LOW = 24 * 1024     # keep at least this much heap free
+
+thumb_ram = {}     # name -> page-format bytearray
+thumb_lru = []     # names, least recently used first
+thumb_bad = set()  # names without a usable PBM (not prefetched again)
+
+def get_thumb(name):
+    """Decoded thumbnail for name (raises if the PBM is missing/invalid)."""
+    buf = thumb_ram.get(name)
+    if buf is not None:
+        thumb_lru.remove(name)
+        thumb_lru.append(name)
+        return buf
+
+    size = len(display.buffer)
+    if thumb_lru and (len(thumb_lru) + 1) * size > THUMB_RAM_BUDGET:
+        buf = thumb_ram.pop(thumb_lru.pop(0))  # recycle the LRU buffer
+    else:
+        buf = bytearray(size)
+    try:
+        render_thumb(name, buf)
+    except Exception:
+        thumb_bad.add(name)
+        raise
+    thumb_ram[name] = buf
+    thumb_lru.append(name)
+    return buf
+
+def trim_thumbs(keep):
+    """Evict LRU thumbnails (never keep) while the heap is short."""
+    if gc.mem_free() >= THUMB_MEM_LOW:
+        return
+    gc.collect()
+    i = 0
+    while gc.mem_free() < THUMB_MEM_LOW and i < len(thumb_lru):
+        if thumb_lru[i] == keep:
+            i += 1
+            continue
+        del thumb_ram[thumb_lru.pop(i)]
+        gc.collect()
+
+def prefetch_neighbours(game_files, current):
+    """One idle step: decode the next or previous entry if not in RAM yet.
+    Returns True if it did some work."""
+    keep = game_files[current]
+    trim_thumbs(keep)
+    if gc.mem_free() < THUMB_MEM_LOW:
+        return False
+    for j in (current + 1, current - 1):
+        name = game_files[j % len(game_files)]
+        if name in thumb_ram or name in thumb_bad:
+            continue
+        try:
+            get_thumb(name)
+        except Exception:
+            pass  # shown as "[No image]" when selected
+        return True
+    return False
 
 # =========================
 # === FUNZIONI BASE =======
 # =========================
 def load_and_display_image(name):
-    path = f"{GAMES_FOLDER}/{name}.pbm"
     try:
-        draw_pbm_to_display(path)
+        if name in thumb_ram or not atlas_read(name, display.buffer):
+            display.buffer[:] = get_thumb(name)
+        display.show()
     except Exception as e:
+        title = game_info[name]["title"] if name in game_info else name
         display.fill(0)
-        display.text(name[:16], 0, 25)
+        display.text(title[:16], 0, 25)
         display.text("[No image]", 0, 40)
         display.show()
-        print("Warning: immagine non trovata o invalida:", path, e)
+        print("Warning: immagine non trovata o invalida:", name, e)
 
 def show_logo():
     path = "logo.pbm"
@@ -112,16 +319,106 @@ def show_logo():
         time.sleep(1.5)
         print("Logo skipped:", e)
 
-def launch_game(name):
+# Fast boot logo: logo.pbm decoded once into a page blob, b"LGO1" + pbm
+# size u32 + pbm mtime u32 + the image (exactly display.buffer), and read
+# straight into the buffer on later boots. Rebuilt when logo.pbm changes.
+LOGO_PBM = "logo.pbm"
+LOGO_BLOB = "logo.bin"
+LOGO_MAGIC = b"LGO1"
+
+def load_logo(buf):
+    """Logo into buf from the blob; decodes logo.pbm (and rewrites the blob) if stale."""
+    try:
+        st = os.stat(LOGO_PBM)
+        key = (st[6], st[8])
+    except OSError:
+        key = None  # the blob alone is enough
     try:
-        if name in sys.modules:
-            del sys.modules[name]
+        with open(LOGO_BLOB, "rb") as f:
+            head = f.read(12)
+            if (len(head) == 12 and head[:4] == LOGO_MAGIC
+                    and (key is None or struct.unpack("<II", head[4:]) == key)
+                    and f.readinto(buf) == len(buf)):
+                return
+    except OSError:
+        pass
+    if key is None:
+        raise OSError("no logo")
+    render_pbm(LOGO_PBM, buf)
+    try:
+        with open(LOGO_BLOB, "wb") as f:
+            f.write(LOGO_MAGIC + struct.pack("<II", key[0], key[1]))
+            f.write(buf)
+    except OSError as e:
+        print("Warning: logo.bin non scritto:", e)
+
+def show_logo_fast():
+    """Logo up with no wait: it stays on screen while warm_up() runs."""
+    try:
+        load_logo(display.buffer)
+    except Exception as e:
+        display.fill(0)
+        display.text("Welcome!", 25, 25)
+        print("Logo skipped:", e)
+    display.show()
+
+def load_games():
+    """Manifest (built on first boot) and atlas; (manifest, menu order)."""
+    man = manifest.load(GAMES_FOLDER) or manifest.build(GAMES_FOLDER)
+    return man, use_manifest(man)
+
+def warm_up(game_files):
+    """Boot work behind the logo: first menu image in RAM, bytecode stamps checked."""
+    if game_files:
+        try:
+            get_thumb(game_files[0])
+        except Exception:
+            pass  # shown as "[No image]"
+    for name in game_files:
+        mpycache.prepare(GAMES_FOLDER, name)
+
+# Heap per game (heaplog.py): before launch, peak, after exit; the last runs
+# of every game stay in heap_log for heap_log.report() from the REPL
+heap_log = heaplog.HeapLog()
+
+def unload_game(name):
+    # Drop the game module and everything its globals hold (buffers, sprites,
+    # level data) instead of waiting for the next import to replace it
+    mod = sys.modules.pop(name, None)
+    if mod is not None:
+        mod.__dict__.clear()
 
-        mod = __import__(name)
-        if hasattr(mod, "play_game"):
-            mod.play_game()
+def launch_game(name):
+    # Per-game profile from the manifest: CPU clock, bus rate, heap need
+    info = game_info.get(name, {})
+    old_freq = 0
+    if info.get("cpu_freq"):
+        old_freq = machine.freq()
+        machine.freq(info["cpu_freq"])
+    if info.get("i2c_freq"):
+        hwconfig.retune(display, info["i2c_freq"])
+    if info.get("heap") and gc.mem_free() < info["heap"]:
+        thumb_ram.clear()
+        del thumb_lru[:]
+    heap_log.before(name, display)  # gc.collect() + snapshot
+    mod = entry = None
+    try:
+        # play_game(ctx) games do nothing at import; older ones run right here.
+        # Fresh .mpy bytecode is imported when there is one, else the source
+        mod, kind, us = mpycache.load(GAMES_FOLDER, name)
+        print("Import %s (%s): %d us" % (name, kind, us))
+        entry = getattr(mod, info.get("entry") or "play_game", None)
+        if entry is not None:
+            # the menu read the launching UP/DOWN press through get(), which
+            # leaves it latched for Button.value(): the game starts clean
+            ctx.input.clear()
+            entry(ctx)
+
+    except (gamectx.GameExit, SystemExit):
+        pass
 
     except Exception as e:
+        ctx.release()
         display.fill(0)
         display.text("Game crash", 0, 0)
         display.text(name[:16], 0, 10)
@@ -130,6 +427,16 @@ def launch_game(name):
         time.sleep(2)
 
     finally:
+        if hwconfig.GAME_I2C_FREQ:
+            hwconfig.retune(display)
+        if old_freq:
+            machine.freq(old_freq)
+        # the game drew on the panel behind our back: resend everything
+        ctx.release()
+        mod = entry = None
+        unload_game(name)
+        run = heap_log.after(name)
+        print("Heap", heap_log.line(name, run))
         display.fill(0)
         display.show()
         time.sleep(0.2)
@@ -137,46 +444,86 @@ def launch_game(name):
 # =========================
 # === MENU DI SELEZIONE ===
 # =========================
-def run_menu():
-    game_files = [f[:-3] for f in os.listdir(GAMES_FOLDER) if f.endswith(".py")]
-    game_files.sort()
+def run_menu(man, game_files):
+    checked = False
 
     if not game_files:
         display.fill(0)
         display.text("Nessun gioco", 10, 20)
         display.text("trovato!", 30, 35)
         display.show()
+        boot_phase("first menu frame")
+        boot_report()
         return
 
     current_game = 0
     load_and_display_image(game_files[current_game])
+    boot_phase("first menu frame")
+    boot_report()
+    inp.clear()
+    last_step = time.ticks_ms()
 
     while True:
-        if not btn_right.value():
-            current_game = (current_game + 1) % len(game_files)
-            load_and_display_image(game_files[current_game])
-            time.sleep(0.2)
-
-        if not btn_left.value():
-            current_game = (current_game - 1) % len(game_files)
-            load_and_display_image(game_files[current_game])
-            time.sleep(0.2)
-
-        if not btn_up.value() or not btn_down.value():
-            display.fill(0)
-            display.text("Starting game...", 0, 0)
-            display.show()
-            time.sleep(0.5)
-
-            launch_game(game_files[current_game])
+        # one button event per pass; LEFT/RIGHT held repeat on their own
+        ev = inp.get()
+        move = 0
+        if ev >= 0:
+            if not inputq.is_press(ev):
+                continue
+            b = inputq.button(ev)
+            if b == inputq.RIGHT:
+                move = 1
+            elif b == inputq.LEFT:
+                move = -1
+            else:
+                display.fill(0)
+                display.text("Starting game...", 0, 0)
+                display.show()
+                time.sleep(0.5)
+
+                launch_game(game_files[current_game])
+
+                load_and_display_image(game_files[current_game])
+                continue
+        elif time.ticks_diff(time.ticks_ms(), last_step) >= MENU_REPEAT_MS:
+            move = inp.held(inputq.RIGHT) - inp.held(inputq.LEFT)
 
+        if move:
+            current_game = (current_game + move) % len(game_files)
             load_and_display_image(game_files[current_game])
-            time.sleep(0.2)
-
+            last_step = time.ticks_ms()
+            continue
+
+        # idle: warm the neighbours' thumbnails instead of just sleeping,
+        # then check the folder once against the atlas
+        if prefetch_neighbours(game_files, current_game):
+            continue
+        if not checked:
+            checked = True
+            new_man = manifest.check(GAMES_FOLDER, man)
+            if new_man and new_man["games"]:
+                man = new_man
+                game_files = use_manifest(man)
+                current_game %= len(game_files)
+                thumb_ram.clear()
+                del thumb_lru[:]
+                thumb_bad.clear()
+                load_and_display_image(game_files[current_game])
+            continue
         time.sleep(0.02)
 
 # =========================
 # === AVVIO DEL PROGRAMMA ===
 # =========================
-show_logo()
-run_menu()
+if FAST_BOOT:
+    show_logo_fast()
+    boot_phase("logo")
+    man, game_files = load_games()
+    warm_up(game_files)
+    boot_phase("cache warm")
+else:
+    show_logo()
+    boot_phase("logo")
+    man, game_files = load_games()
+    boot_phase("manifest")
+run_menu(man, game_files)
@@ -0,0 +1,110 @@
+# manifest.py
+# games/manifest.json: one compact index of the installed games, read in one
+# pass at boot instead of listing the folder and importing modules.
+#
+# Per game:
+#   module    import name (file name without .py)
+#   title     menu title
+#   thumb     menu image (PBM file in the games folder, "" = none)
+#   entry     function the launcher calls with the game context after import,
+#             play_game(ctx) (gamectx.py); "" = an older game that runs at import
+#   i2c_freq  preferred display bus rate in Hz (0 = hwconfig default)
+#   cpu_freq  machine.freq() while the game runs (0 = leave as is)
+#   heap      bytes the game expects free at start (0 = unknown)
+#
+# Games declare non-default values in a comment near the top of their source:
+#     # manifest: title=Donkey Kong cpu_freq=200000000 heap=60000
+# Missing keys get defaults: title from the file name, thumb <module>.pbm if
+# present, entry "play_game" if the module defines it. The manifest also
+# records size/mtime of every .py/.pbm, so check() can tell when the folder
+# changed and rebuild it.
+
+import os
+import json
+
+FILE = "manifest.json"
+TAG = "# manifest:"
+TAG_LINES = 30  # only the top of the source is searched for the tag
+INT_KEYS = ("i2c_freq", "cpu_freq", "heap")
+KEYS = ("title", "thumb", "entry") + INT_KEYS
+
+
+def scan_files(folder):
+    """{file name: [size, mtime]} for every .py/.pbm in folder."""
+    files = {}
+    for name in os.listdir(folder):
+        if name.endswith(".py") or name.endswith(".pbm"):
+            st = os.stat(folder + "/" + name)
+            files[name] = [st[6], st[8]]
+    return files
+
+
+def parse_tag(line, game):
+    # "key=value key=value ..."; a value runs until the next known key=
+    key = None
+    for token in line[len(TAG):].split():
+        k = token.split("=", 1)[0]
+        if k in KEYS and "=" in token:
+            key = k
+            game[key] = token[len(k) + 1:]
+        elif key is not None:
+            game[key] += " " + token
+    for k in INT_KEYS:
+        game[k] = int(game[k])
+
+
+def read_game(folder, module, files):
+    """Manifest entry for one game from its source file."""
+    game = {"module": module, "title": module, "thumb": "", "entry": "",
+            "i2c_freq": 0, "cpu_freq": 0, "heap": 0}
+    if module + ".pbm" in files:
+        game["thumb"] = module + ".pbm"
+    has_play = False
+    with open("%s/%s.py" % (folder, module)) as f:
+        n = 0
+        for line in f:
+            if n < TAG_LINES and line.startswith(TAG):
+                try:
+                    parse_tag(line.strip(), game)
+                except ValueError as e:
+                    print("Warning: manifest tag in", module, e)
+            if line.startswith("def play_game("):
+                has_play = True
+            n += 1
+    if not game["entry"] and has_play:
+        game["entry"] = "play_game"
+    return game
+
+
+def build(folder, files=None):
+    """Scan folder, write the manifest and return it."""
+    if files is None:
+        files = scan_files(folder)
+    modules = sorted(name[:-3] for name in files if name.endswith(".py"))
+    man = {"files": files, "games": [read_game(folder, m, files) for m in modules]}
+    try:
+        with open(folder + "/" + FILE, "w") as f:
+            json.dump(man, f)
+    except OSError as e:
+        print("Warning: manifest non scritto:", e)
+    return man
+
+
+def load(folder):
+    """The stored manifest, or None if missing/unreadable."""
+    try:
+        with open(folder + "/" + FILE) as f:
+            man = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if "files" not in man or "games" not in man:
+        return None
+    return man
+
+
+def check(folder, man):
+    """Rescan the folder; rebuilt manifest if anything changed, else None."""
+    files = scan_files(folder)
+    if files == man["files"]:
+        return None
+    return build(folder, files)
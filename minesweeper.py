@@ -1,4 +1,5 @@
 # minesweeper_v5.py — Minesweeper for Pico + SSD1306 (portrait 64x128)
+# manifest: title=Minesweeper
 #
 # Changes vs v4 (per request):
 # - End (BOOM / YOU WIN) screen: moved everything UP so nothing is off-screen.
@@ -11,27 +12,19 @@
 #   UP+DN hold (~0.7s): restart
 #   DOWN on title/end: return to menu (exit script)
 
-from machine import Pin, I2C
-import ssd1306
+import gamectx
 import time
 import random
-import sys
 
-time.sleep(0.15)
-
-i2c = I2C(0, scl=Pin(21), sda=Pin(20))
-oled = ssd1306.SSD1306_I2C(128, 64, i2c)
-
-btn_up    = Pin(19, Pin.IN, Pin.PULL_UP)
-btn_down  = Pin(18, Pin.IN, Pin.PULL_UP)
-btn_right = Pin(16, Pin.IN, Pin.PULL_UP)
-btn_left  = Pin(17, Pin.IN, Pin.PULL_UP)
+# Display and buttons come from the launcher: play_game() below, gamectx.py
+oled = None
+btn_up = btn_down = btn_right = btn_left = None
 
 W, H = 64, 128
 
 def draw_pixel(x, y, c=1):
-    if 0 <= x < 64 and 0 <= y < 128:
-        oled.pixel(y, 63 - x, c)
+    # oled is the 64x128 portrait surface (ctx.screen(90)); framebuf clips
+    oled.pixel(x, y, c)
 
 def fill(c=0):
     oled.fill(c)
@@ -107,9 +100,7 @@ def draw_glyph(ch, x, y, scale=1, c=1):
         bits = rows[ry]
         for rx in range(3):
             if (bits >> (2-rx)) & 1:
-                for sy in range(scale):
-                    for sx in range(scale):
-                        draw_pixel(x + rx*scale + sx, y + ry*scale + sy, c)
+                oled.fill_rect(x + rx*scale, y + ry*scale, scale, scale, c)
 
 def text_width(s, scale=1, spacing=1):
     if not s:
@@ -129,12 +120,7 @@ def draw_text_center(s, y, scale=1):
     draw_text(s, x, y, scale=scale)
 
 def draw_rect(x, y, w, h, c=1):
-    for i in range(w):
-        draw_pixel(x+i, y, c)
-        draw_pixel(x+i, y+h-1, c)
-    for j in range(h):
-        draw_pixel(x, y+j, c)
-        draw_pixel(x+w-1, y+j, c)
+    oled.rect(x, y, w, h, c)
 
 def draw_flag(cx, cy):
     draw_pixel(cx, cy-2, 1)
@@ -374,7 +360,7 @@ def main():
 
     while True:
         if not title_screen():
-            sys.exit()
+            return
 
         mines, nums, vis, flag = make_empty()
         cur_r, cur_c = 0, 0
@@ -427,7 +413,7 @@ def main():
                         show()
                         time.sleep_ms(900)
                         if not end_screen(False, elapsed):
-                            sys.exit()
+                            return
                         break
                     else:
                         if nums[cur_r][cur_c] == 0:
@@ -441,9 +427,18 @@ def main():
                             show()
                             time.sleep_ms(900)
                             if not end_screen(True, elapsed):
-                                sys.exit()
+                                return
                             break
 
             time.sleep_ms(35)
 
-main()
+def play_game(ctx):
+    global oled, btn_up, btn_down, btn_right, btn_left
+    oled = ctx.screen(90)
+    btn_up, btn_down = ctx.btn_up, ctx.btn_down
+    btn_right, btn_left = ctx.btn_right, ctx.btn_left
+    time.sleep(0.15)
+    main()
+
+if __name__ == "__main__":
+    gamectx.run(play_game)
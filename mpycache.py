@@ -0,0 +1,268 @@
+# mpycache.py
+# Precompiled bytecode for the games, so launch_game() imports .mpy instead of
+# parsing and compiling the source on the board every time.
+#
+# MicroPython cannot write .mpy files itself, so the cache is filled by
+# mpy-cross, on the PC:
+#
+#     python3 mpycache.py games          # games/*.py -> games/.mpy/*.mpy
+#     mpremote cp -r games/.mpy :games/  # (or copy the whole folder)
+#
+# or directly wherever the mpy_cross package / mpy-cross binary is present
+# (compile_game()). The .mpy version has to match the firmware: build with the
+# mpy-cross release that matches it.
+#
+# games/.mpy sits in front of games on sys.path (use_cache()). STAMPS records
+# size + CRC32 of the source each .mpy was built from; prepare(name) checks
+# it before the import, and a stale, unstamped or unloadable .mpy is deleted
+# so the source is imported instead. The first check on the board also reads
+# the CRC (size only without binascii.crc32); after that the stored mtime
+# settles it with a single stat.
+#
+# timing holds the last import time per game, from .mpy or from source, and
+# report() prints it; bench(name) times both for one game.
+
+import os
+import sys
+import json
+
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None  # size-only staleness check
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    from time import perf_counter as _perf
+
+    def ticks_us():
+        return int(_perf() * 1000000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+DIR = ".mpy"
+STAMPS = "stamps.json"
+CHUNK = 512
+
+timing = {}  # module -> {"mpy": us, "py": us}
+_cross = None  # how to run mpy-cross here, found on first use
+
+
+def _path(folder, name=""):
+    return folder + "/" + DIR + ("/" + name if name else "")
+
+
+def _exists(path):
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+
+def source_crc(path):
+    if crc32 is None:
+        return 0
+    crc = 0
+    buf = bytearray(CHUNK)
+    mv = memoryview(buf)
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            crc = crc32(mv[:n], crc)
+    return crc
+
+
+def load_stamps(folder):
+    try:
+        with open(_path(folder, STAMPS)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_stamps(folder, stamps):
+    try:
+        with open(_path(folder, STAMPS), "w") as f:
+            json.dump(stamps, f)
+    except OSError as e:
+        print("Warning: stamps .mpy non scritti:", e)
+
+
+def use_cache(folder):
+    # Cache directory ahead of the source folder on sys.path
+    # (MicroPython prefers name.py over name.mpy in the same directory)
+    cache = _path(folder)
+    if cache in sys.path:
+        sys.path.remove(cache)
+    if folder in sys.path:
+        sys.path.insert(sys.path.index(folder), cache)
+    else:
+        sys.path.append(cache)
+
+
+def drop(folder, name, stamps=None):
+    # Forget the .mpy of one module; the next import uses the source
+    try:
+        os.remove(_path(folder, name + ".mpy"))
+    except OSError:
+        pass
+    if stamps is None:
+        stamps = load_stamps(folder)
+    if stamps.pop(name, None) is not None:
+        save_stamps(folder, stamps)
+
+
+def fresh(folder, name, stamps):
+    # True if .mpy/<name>.mpy was built from the current <name>.py
+    if not _exists(_path(folder, name + ".mpy")):
+        return False
+    src = "%s/%s.py" % (folder, name)
+    try:
+        st = os.stat(src)
+    except OSError:
+        return True  # shipped as .mpy only
+    stamp = stamps.get(name)
+    if stamp is None:
+        return False  # built elsewhere from who knows what source
+    size, crc, mtime = stamp
+    if st[6] != size:
+        return False
+    if mtime and st[8] == mtime:
+        return True
+    if crc32 is not None and source_crc(src) != crc:
+        return False
+    stamp[2] = st[8]
+    save_stamps(folder, stamps)
+    return True
+
+
+def _find_cross():
+    # mpy_cross package, else an mpy-cross binary on PATH, else "" (the board)
+    global _cross
+    if _cross is None:
+        _cross = ""
+        try:
+            import mpy_cross
+            _cross = lambda args: mpy_cross.run(*args).wait() == 0
+        except ImportError:
+            try:
+                import subprocess
+                subprocess.call(["mpy-cross", "--version"], stdout=subprocess.DEVNULL)
+                _cross = lambda args: subprocess.call(["mpy-cross"] + args) == 0
+            except (ImportError, OSError):
+                pass
+    return _cross
+
+
+def compile_game(folder, name, stamps=None, march=None):
+    # <name>.py -> .mpy/<name>.mpy with mpy-cross; False where there is none
+    cross = _find_cross()
+    if not cross:
+        return False
+    src = "%s/%s.py" % (folder, name)
+    try:
+        os.mkdir(_path(folder))
+    except OSError:
+        pass
+    args = ["-o", _path(folder, name + ".mpy")] + (["-march=" + march] if march else []) + [src]
+    if not cross(args):
+        return False
+    if stamps is None:
+        stamps = load_stamps(folder)
+    st = os.stat(src)
+    stamps[name] = [st[6], source_crc(src), 0]
+    save_stamps(folder, stamps)
+    return True
+
+
+def prepare(folder, name):
+    # Before importing a game: "mpy" if the import will load fresh bytecode,
+    # else "py" (stale or unstamped .mpy removed, recompiled where mpy-cross
+    # exists)
+    stamps = load_stamps(folder)
+    if fresh(folder, name, stamps):
+        return "mpy"
+    drop(folder, name, stamps)
+    if compile_game(folder, name, stamps):
+        return "mpy"
+    return "py"
+
+
+def load(folder, name):
+    # prepare() + __import__ with timing -> (module, "mpy"/"py", us). An .mpy
+    # the firmware refuses (wrong version) is dropped and the source imported
+    if name in sys.modules:
+        del sys.modules[name]
+    kind = prepare(folder, name)
+    t0 = ticks_us()
+    try:
+        mod = __import__(name)
+    except ValueError as e:
+        if kind != "mpy":
+            raise
+        print("Warning: .mpy non valido per", name, e)
+        drop(folder, name)
+        sys.modules.pop(name, None)
+        kind = "py"
+        t0 = ticks_us()
+        mod = __import__(name)
+    us = ticks_diff(ticks_us(), t0)
+    timing.setdefault(name, {})[kind] = us
+    return mod, kind, us
+
+
+def report():
+    for name in sorted(timing):
+        t = timing[name]
+        print("%-12s mpy %6s us   py %6s us" % (name, t.get("mpy", "-"), t.get("py", "-")))
+
+
+def bench(folder, name):
+    # Import one game from source and from its .mpy, microseconds each
+    # (the game modules do nothing at import, see gamectx.py)
+    cache = _path(folder)
+    had = cache in sys.path
+    try:
+        if had:
+            sys.path.remove(cache)
+        sys.modules.pop(name, None)
+        t0 = ticks_us()
+        __import__(name)
+        py = ticks_diff(ticks_us(), t0)
+        use_cache(folder)
+        sys.modules.pop(name, None)
+        if prepare(folder, name) != "mpy":
+            return {"py_us": py, "mpy_us": None}
+        t0 = ticks_us()
+        __import__(name)
+        mpy = ticks_diff(ticks_us(), t0)
+    finally:
+        if cache in sys.path:
+            sys.path.remove(cache)
+        if had:
+            use_cache(folder)
+        sys.modules.pop(name, None)
+    return {"py_us": py, "mpy_us": mpy}
+
+
+def build(folder, march=None):
+    # Compile every game in folder (run on the PC)
+    stamps = load_stamps(folder)
+    built = []
+    for fn in sorted(os.listdir(folder)):
+        if fn.endswith(".py"):
+            if compile_game(folder, fn[:-3], stamps, march):
+                built.append(fn[:-3])
+            else:
+                print("mpy-cross failed:", fn)
+    return built
+
+
+if __name__ == "__main__":
+    print(build(sys.argv[1] if len(sys.argv) > 1 else "games",
+                sys.argv[2] if len(sys.argv) > 2 else None))
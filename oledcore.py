@@ -0,0 +1,926 @@
+# oledcore.py
+# Shared core for the SSD1306 / SH1106 drivers (128x64 panels, 132-column RAM).
+# Controller drivers (ssd1306.py, sh1106.py) add their init sequence and any
+# controller-only features on top; I2CMixin adds the I2C transport.
+#
+# What lives here:
+# - Framebuffer + optional portrait surface (rotation=90/270): drawing runs at
+#   framebuf speed and show() does one 8x8 block transpose per tile;
+#   set_rotation() switches it on a live panel, restore() hands it back
+# - Wire-ready page buffer: [0x40][132 RAM columns] per page, hidden columns
+#   always zero, visible part doubles as the shadow of what the panel holds
+# - Dirty tracking: show() sends only changed pages, and only the changed
+#   column run inside them; first write of a page / show(force=True) sends the
+#   full 132 bytes. show_region() flushes a known rectangle.
+# - Allocation-free steady state (track_alloc=True records show() heap use)
+# - Batched commands: write_cmds() = one Co=0 transaction (cmd_batch=False
+#   falls back to one byte per transaction for bad clones)
+# - I2CMixin / SPIMixin transports (SPI: one CS-framed burst per page write)
+# - Async double buffering: start_async()/present(), worker on core 1 (_thread)
+#   or a threading.Thread on CPython
+# - Warm attach: warm=True skips init_display() + RAM scrub when the launcher
+#   recorded an initialized panel with mark_warm(); only the registers games
+#   change are re-sent
+# - Bus-traffic stats: enable_stats() swaps in counting wrappers per instance,
+#   stats()/stats_line() read them; disabled costs nothing
+
+import framebuf
+from array import array
+
+try:
+    from gc import mem_alloc
+except ImportError:
+    mem_alloc = None
+
+try:
+    import threading
+
+    def _spawn(fn):
+        t = threading.Thread(target=fn)
+        t.daemon = True
+        t.start()
+except ImportError:
+    import _thread
+
+    def _spawn(fn):
+        _thread.start_new_thread(fn, ())
+
+try:
+    from time import sleep_us as _sleep_us, sleep_ms as _sleep_ms
+
+    def _nap():
+        _sleep_us(200)
+except ImportError:
+    from time import sleep as _sleep
+
+    def _nap():
+        _sleep(0.0002)
+
+    def _sleep_ms(ms):
+        _sleep(ms / 1000)
+
+try:
+    from time import ticks_us, ticks_diff, ticks_add
+except ImportError:
+    from time import perf_counter as _perf
+
+    def ticks_us():
+        return int(_perf() * 1000000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+    def ticks_add(a, b):
+        return a + b
+
+RAM_COLS   = 132
+COL_OFFSET = 2  # your proven-good offset
+WIRE_STRIDE = 1 + RAM_COLS  # 0x40 control byte + one full RAM page
+
+# present() policy when the previous frame is still on the bus
+PRESENT_WAIT = 0  # block until the worker is free (never loses a frame)
+PRESENT_DROP = 1  # skip this frame; call present()/sync() again later
+
+# Panels initialized earlier in this session (set by the launcher with
+# mark_warm); the module outlives the games' display objects
+_warm = {}
+
+
+def mark_warm(display):
+    # display finished init_display(); later drivers for the same panel may
+    # attach with warm=True
+    _warm[display._warm_key()] = True
+
+
+def forget_warm():
+    _warm.clear()
+
+
+# Counters reported by stats(); *_us are cumulative, *_max the worst single call
+_STAT_KEYS = (
+    "tx", "cmd_bytes", "data_bytes", "flushes", "pages_sent", "pages_skipped",
+    "cmd_us", "cmd_max", "data_us", "data_max", "show_us", "show_max",
+)
+# Methods enable_stats() wraps on the instance
+_STAT_WRAPPED = (
+    "write_cmd", "write_cmds", "write_data", "write_wire", "write_burst",
+    "show", "show_region", "_flush_page", "_show_burst",
+)
+
+
+# 8x8 transpose tables: bit b of v moved to bit 0 of byte b (b=0..3 in _T_LO,
+# b=4..7 in _T_HI). OR-ing table[v] << shift over 8 source bytes builds 8
+# transposed bytes at once.
+_T_LO = array("I", [0] * 256)
+_T_HI = array("I", [0] * 256)
+for _v in range(256):
+    for _b in range(4):
+        if _v & (1 << _b):
+            _T_LO[_v] |= 1 << (8 * _b)
+        if _v & (0x10 << _b):
+            _T_HI[_v] |= 1 << (8 * _b)
+del _v, _b
+
+
+# --- byte-run helpers (viper when available, plain Python otherwise) ---
+try:
+    import micropython
+
+    @micropython.viper
+    def _copy(dst, doff: int, src, soff: int, n: int):
+        d = ptr8(dst)
+        s = ptr8(src)
+        i = 0
+        while i < n:
+            d[doff + i] = s[soff + i]
+            i += 1
+
+    @micropython.viper
+    def _first_diff(a, aoff: int, b, boff: int, n: int) -> int:
+        pa = ptr8(a)
+        pb = ptr8(b)
+        i = 0
+        while i < n:
+            if pa[aoff + i] != pb[boff + i]:
+                return i
+            i += 1
+        return n
+
+    @micropython.viper
+    def _last_diff(a, aoff: int, b, boff: int, n: int) -> int:
+        pa = ptr8(a)
+        pb = ptr8(b)
+        i = n - 1
+        while i >= 0:
+            if pa[aoff + i] != pb[boff + i]:
+                return i
+            i -= 1
+        return -1
+
+    @micropython.viper
+    def _transpose(src, dst, t_lo, t_hi, pw: int, ph: int, r90: int):
+        # Portrait MONO_VLSB (pw x ph) -> landscape page buffer (ph x pw)
+        s = ptr8(src)
+        d = ptr8(dst)
+        tl = ptr32(t_lo)
+        th = ptr32(t_hi)
+        pages = pw >> 3
+        q = 0
+        while q < (ph >> 3):
+            k = 0
+            while k < pages:
+                base = q * pw + (k << 3)
+                lo = 0
+                hi = 0
+                i = 0
+                while i < 8:
+                    v = s[base + i]
+                    if r90:
+                        sh = 7 - i
+                    else:
+                        sh = i
+                    lo |= tl[v] << sh
+                    hi |= th[v] << sh
+                    i += 1
+                if r90:
+                    o = (pages - 1 - k) * ph + (q << 3)
+                    step = 1
+                else:
+                    o = k * ph + ph - 1 - (q << 3)
+                    step = -1
+                b = 0
+                while b < 32:
+                    d[o] = lo >> b
+                    d[o + (step << 2)] = hi >> b
+                    o += step
+                    b += 8
+                k += 1
+            q += 1
+
+except (ImportError, AttributeError):
+    def _copy(dst, doff, src, soff, n):
+        dst[doff:doff + n] = src[soff:soff + n]
+
+    def _first_diff(a, aoff, b, boff, n):
+        if a[aoff:aoff + n] == b[boff:boff + n]:
+            return n
+        i = 0
+        while a[aoff + i] == b[boff + i]:
+            i += 1
+        return i
+
+    def _last_diff(a, aoff, b, boff, n):
+        i = n - 1
+        while i >= 0 and a[aoff + i] == b[boff + i]:
+            i -= 1
+        return i
+
+    def _transpose(src, dst, t_lo, t_hi, pw, ph, r90):
+        pages = pw >> 3
+        for q in range(ph >> 3):
+            for k in range(pages):
+                base = q * pw + (k << 3)
+                lo = hi = 0
+                for i in range(8):
+                    v = src[base + i]
+                    if v:
+                        sh = 7 - i if r90 else i
+                        lo |= t_lo[v] << sh
+                        hi |= t_hi[v] << sh
+                if r90:
+                    o = (pages - 1 - k) * ph + (q << 3)
+                    step = 1
+                else:
+                    o = k * ph + ph - 1 - (q << 3)
+                    step = -1
+                for b in (0, 8, 16, 24):
+                    dst[o] = (lo >> b) & 0xFF
+                    dst[o + 4 * step] = (hi >> b) & 0xFF
+                    o += step
+
+
+class OLEDCore:
+    _wire_skip = 0  # leading control bytes the transport does not send
+    bus_retries = 0  # resends after a bus error before it goes to the caller
+
+    def __init__(self, width, height, external_vcc=False, rotation=0, warm=False):
+        self.width = width
+        self.height = height
+        self.external_vcc = external_vcc
+        self.pages = self.height // 8
+
+        # Standard 128x64 framebuffer (always panel/page layout)
+        self.buffer = bytearray(self.width * self.pages)
+        self.pbuffer = None
+        self._surface(rotation)
+        self._flush_buf = self.buffer  # what the flush path reads (front buffer in async mode)
+
+        # Async double buffering (see start_async); off by default
+        self._async = False
+        self._ready = 0        # 1 = a frame was handed to the worker and is not sent yet
+        self._running = False
+        self._worker_alive = False
+        self._force_next = False
+        self.present_policy = PRESENT_WAIT
+        self.frames_presented = 0
+        self.frames_dropped = 0
+        self.async_error = None   # last bus error of the worker (it carries on)
+        self._worker_exc = None   # anything else: the worker stopped, sync() raises it
+
+        # Pages the panel is updating by itself, e.g. an active hardware
+        # scroll; show() leaves them alone (empty: lo > hi)
+        self._scroll_lo = 1
+        self._scroll_hi = 0
+
+        # Wire-ready pages: [0x40][132 RAM columns] per page, laid out once.
+        # The visible part is also the shadow of what the panel holds;
+        # hidden columns are never written, so they stay zero.
+        # _page_ok[p] == 0 means "unknown / must re-send" (boot, force, errors).
+        # Transports without a control byte (SPI) set _wire_skip = 1 and get
+        # views that start after it.
+        skip = self._wire_skip
+        self._wire = bytearray(self.pages * WIRE_STRIDE)
+        wire_mv = memoryview(self._wire)
+        pages = []
+        for page in range(self.pages):
+            self._wire[page * WIRE_STRIDE] = 0x40
+            pages.append(wire_mv[page * WIRE_STRIDE + skip:(page + 1) * WIRE_STRIDE])
+        self._wire_pages = tuple(pages)
+        self._page_ok = bytearray(self.pages)
+
+        # Staging line for column runs: [0x40][run bytes], with one view per length
+        self._span = bytearray(WIRE_STRIDE)
+        self._span[0] = 0x40
+        span_mv = memoryview(self._span)
+        self._span_views = tuple(span_mv[skip:n] for n in range(self.width + 2))
+
+        # Allocation probe (MicroPython gc.mem_alloc); off by default
+        self.track_alloc = False
+        self.show_alloc = 0         # bytes allocated by the last show()
+        self.show_alloc_max = 0     # worst show() seen while tracking
+
+        self.scrub_us = 0  # last _clear_controller_ram() (boot timing)
+
+        # Bus-traffic stats (see enable_stats); off by default
+        self.stats_on = False
+        self._stats = {}
+        self.reset_stats()
+
+        # Reusable command buffers (page setup, 2-byte commands)
+        self._page_cmd = bytearray(3)
+        self._cmd2 = bytearray(2)
+
+        self._prepare()
+        if warm and self._warm_key() in _warm:
+            self.write_cmds(self._attach_cmds())
+        else:
+            self.poweron()
+            self.init_display()
+
+    def poweron(self):
+        pass
+
+    def _warm_key(self):
+        return (type(self).__name__, getattr(self, "addr", None))
+
+    def _attach_cmds(self):
+        # Warm attach: the registers a previous game may have left changed.
+        # RAM is not scrubbed; every page is still unknown, so the first
+        # show() sends all 132 columns anyway.
+        return bytes((
+            0x40,             # start line
+            0xA6,             # normal
+            0x81, 0xCF,       # contrast
+            0xAF              # display on
+        ))
+
+    def _prepare(self):
+        # Hook for controller drivers: runs after the buffers exist, before init
+        pass
+
+    def init_display(self):
+        raise NotImplementedError
+
+    def _clear_controller_ram(self):
+        # Force all pages, all 132 columns to 0 once at boot.
+        # This prevents "appears after logo" ghost junk.
+        t0 = ticks_us()
+        wire = self._wire
+        for page in range(self.pages):
+            base = page * WIRE_STRIDE
+            for i in range(1, WIRE_STRIDE):
+                wire[base + i] = 0
+            self._set_page_col(page, 0)
+            self.write_wire(self._wire_pages[page])
+        # Panel content is no longer what the shadow says
+        self.invalidate()
+        self.scrub_us = ticks_diff(ticks_us(), t0)
+
+    def invalidate(self):
+        # Forget what the panel holds; next show() sends every page
+        for page in range(self.pages):
+            self._page_ok[page] = 0
+
+    def poweroff(self):
+        self.sync()
+        self.write_cmd(0xAE)
+
+    def contrast(self, contrast):
+        self.sync()
+        cmd = self._cmd2
+        cmd[0] = 0x81
+        cmd[1] = contrast & 0xFF
+        self.write_cmds(cmd)
+
+    def invert(self, invert):
+        self.sync()
+        self.write_cmd(0xA7 if invert else 0xA6)
+
+    # --- drawing proxies ---
+    def fill(self, col): self.framebuf.fill(col)
+    def pixel(self, x, y, col): self.framebuf.pixel(x, y, col)
+    def scroll(self, dx, dy): self.framebuf.scroll(dx, dy)
+    def text(self, s, x, y, col=1): self.framebuf.text(s, x, y, col)
+    def rect(self, x, y, w, h, col): self.framebuf.rect(x, y, w, h, col)
+    def fill_rect(self, x, y, w, h, col): self.framebuf.fill_rect(x, y, w, h, col)
+    def blit(self, fbuf, x, y): self.framebuf.blit(fbuf, x, y)
+    def hline(self, x, y, w, col): self.framebuf.hline(x, y, w, col)
+    def vline(self, x, y, h, col): self.framebuf.vline(x, y, h, col)
+    def line(self, x0, y0, x1, y1, col): self.framebuf.line(x0, y0, x1, y1, col)
+
+    def _surface(self, rotation):
+        # Drawing surface: the page buffer itself at rotation 0; at 90/270
+        # framebuf becomes height x width on pbuffer, and buffer is filled
+        # from it by _rotate() at flush time
+        if rotation in (90, 270):
+            if self.pbuffer is None:
+                self.pbuffer = bytearray(len(self.buffer))
+            self.view_width, self.view_height = self.height, self.width
+            self.framebuf = framebuf.FrameBuffer(self.pbuffer, self.height, self.width, framebuf.MONO_VLSB)
+        elif rotation == 0:
+            self.view_width, self.view_height = self.width, self.height
+            self.pbuffer = None
+            self.framebuf = framebuf.FrameBuffer(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
+        else:
+            raise ValueError("rotation must be 0, 90 or 270")
+        self.rotation = rotation
+
+    def set_rotation(self, rotation):
+        # Switch the drawing surface of a live panel (the launcher hands one
+        # driver to landscape and portrait games); what is drawn carries over
+        if rotation == self.rotation:
+            return
+        self.stop_async()
+        self._rotate()
+        self._surface(rotation)
+        if self.pbuffer is not None:
+            self.load_panel(self.buffer)
+
+    def restore(self):
+        # Take the driver back after a game: blocking show(), landscape
+        # surface, attach registers re-sent (normal, contrast, display on),
+        # every page resent by the next show()
+        try:
+            self.stop_async()
+        except Exception:
+            pass  # the game's flush worker died; blocking show() from here on
+        self.set_rotation(0)
+        self.write_cmds(self._attach_cmds())
+        # a game's hardware scroll is over (SSD1306 _attach_cmds() sends
+        # 0x2E): show() owns every page again
+        self._scroll_lo, self._scroll_hi = 1, 0
+        self.invalidate()
+
+    def _rotate(self):
+        # Portrait surface -> page buffer, one 8x8 transpose per tile
+        if self.pbuffer is not None:
+            _transpose(self.pbuffer, self.buffer, _T_LO, _T_HI,
+                       self.height, self.width, self.rotation == 90)
+
+    def load_panel(self, buf):
+        # Put a panel-layout image (landscape MONO_VLSB pages, e.g. a decoded
+        # 128x64 PBM) on the drawing surface; with rotation=90/270 it is
+        # transposed back into the portrait surface so show() lands it as-is
+        if self.pbuffer is None:
+            _copy(self.buffer, 0, buf, 0, len(self.buffer))
+        else:
+            _transpose(buf, self.pbuffer, _T_LO, _T_HI,
+                       self.width, self.height, self.rotation == 270)
+
+    def _set_page_col(self, page, col):
+        cmd = self._page_cmd
+        cmd[0] = 0xB0 + page
+        cmd[1] = 0x00 | (col & 0x0F)  # col low
+        cmd[2] = 0x10 | (col >> 4)    # col high
+        self.write_cmds(cmd)
+
+    def _write_full_page(self, page):
+        # - Set column to 0
+        # - Copy the 128 framebuffer bytes into the wire page at COL_OFFSET
+        #   (hidden columns in the wire page are always zero)
+        # - Send control byte + 132 bytes in ONE I2C transaction
+        _copy(self._wire, page * WIRE_STRIDE + 1 + COL_OFFSET,
+              self._flush_buf, page * self.width, self.width)
+        self._set_page_col(page, 0)
+        self.write_wire(self._wire_pages[page])
+        self._page_ok[page] = 1
+
+    def _flush_page(self, page, x0, x1, force):
+        # Send what changed in columns x0..x1-1 of one page.
+        if self._scroll_lo <= page <= self._scroll_hi:
+            return  # the panel is scrolling this page by itself
+        if force or not self._page_ok[page]:
+            self._write_full_page(page)
+            return
+
+        buf = self._flush_buf
+        wire = self._wire
+        src = self.width * page + x0
+        dst = page * WIRE_STRIDE + 1 + COL_OFFSET + x0
+        n = x1 - x0
+
+        # narrow to the first/last changed column
+        first = _first_diff(buf, src, wire, dst, n)
+        if first == n:
+            return
+        last = _last_diff(buf, src, wire, dst, n)
+        run = last - first + 1
+
+        self._set_page_col(page, COL_OFFSET + x0 + first)
+        _copy(self._span, 1, buf, src + first, run)
+        _copy(wire, dst + first, buf, src + first, run)
+        self.write_wire(self._span_views[run + 1])
+
+    def show(self, force=False):
+        # For each page that changed since the last flush (or every page if force)
+        # send the changed column run; first write of a page sends all 132 bytes.
+        # force=True is the escape hatch for clone panels that pick up residue.
+        if self._async:
+            self.present(force)
+            return
+        self._rotate()
+        if self.track_alloc and mem_alloc:
+            a0 = mem_alloc()
+            self._flush_frame(force)
+            used = mem_alloc() - a0
+            self.show_alloc = used
+            if used > self.show_alloc_max:
+                self.show_alloc_max = used
+        else:
+            self._flush_frame(force)
+
+    def _flush_frame(self, force):
+        # A failed transaction may have been partly ACKed and left the
+        # controller's column pointer anywhere: every page goes back to
+        # unknown and the frame is sent again, re-addressed page by page.
+        # After bus_retries failures in a row the error goes to the caller.
+        n = self.bus_retries
+        while True:
+            try:
+                self._show_pages(force)
+                return
+            except OSError:
+                self.invalidate()
+                if n <= 0:
+                    raise
+                n -= 1
+
+    def _show_pages(self, force):
+        for page in range(self.pages):
+            self._flush_page(page, 0, self.width, force)
+
+    def show_region(self, x, y, w, h):
+        # Flush only the rectangle the caller knows it touched
+        # (in portrait coordinates when rotated).
+        if self._async:
+            self.present()
+            return
+        if self.rotation == 90:
+            x, y, w, h = y, self.height - x - w, h, w
+        elif self.rotation == 270:
+            x, y, w, h = self.width - y - h, x, h, w
+        self._rotate()
+        x0 = max(0, x)
+        x1 = min(self.width, x + w)
+        y0 = max(0, y)
+        y1 = min(self.height, y + h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        try:
+            for page in range(y0 >> 3, ((y1 - 1) >> 3) + 1):
+                self._flush_page(page, x0, x1, False)
+        except OSError:
+            self.invalidate()
+            if self.bus_retries <= 0:
+                raise
+            self._flush_frame(False)
+
+    # --- async double buffering ---
+    def start_async(self, policy=PRESENT_WAIT):
+        # Allocate the second buffer and start the flush worker (core 1 on Pico)
+        self.present_policy = policy
+        if self._async:
+            return
+        size = len(self.buffer)
+        other = bytearray(size)
+        _copy(other, 0, self.buffer, 0, size)
+        self._bufs = (self.buffer, other)
+        if self.pbuffer is None:
+            self._fbs = (self.framebuf,
+                         framebuf.FrameBuffer(other, self.width, self.height, framebuf.MONO_VLSB))
+        else:
+            self._fbs = (self.framebuf, self.framebuf)  # portrait surface stays put
+        self._back = 0
+        self._ready = 0
+        self.async_error = None
+        self._worker_exc = None
+        self._running = True
+        self._worker_alive = True
+        self._async = True
+        _spawn(self._worker)
+
+    def stop_async(self):
+        # Drain the last frame, stop the worker, go back to blocking show()
+        if not self._async:
+            return
+        self.sync()
+        self._running = False
+        while self._worker_alive:
+            _nap()
+        self._async = False
+        self._flush_buf = self.buffer
+        self._bufs = self._fbs = None
+
+    def sync(self):
+        # Wait until the worker has finished the frame it was handed; if it
+        # died on the way, its exception is raised here
+        while self._ready:
+            _nap()
+        if self._worker_exc is not None:
+            self._worker_failed()
+
+    def _worker_failed(self):
+        # Back to blocking show() on the current back buffer, then raise
+        e = self._worker_exc
+        self._worker_exc = None
+        self._running = False
+        self._async = False
+        self._flush_buf = self.buffer
+        self._bufs = self._fbs = None
+        self.invalidate()
+        raise e
+
+    def present(self, force=False):
+        # Hand the back buffer to the worker and keep drawing on a copy of it.
+        # Returns False if the frame was dropped (PRESENT_DROP and bus busy).
+        if not self._async:
+            self.show(force)
+            return True
+        if self._worker_exc is not None:
+            self._worker_failed()
+        if self._ready:
+            if self.present_policy == PRESENT_DROP:
+                self.frames_dropped += 1
+                return False
+            self.sync()
+        back = self._back
+        self._rotate()  # portrait surface -> back page buffer
+        front_buf = self._bufs[back]
+        self._back = back ^ 1
+        new_back = self._bufs[self._back]
+        _copy(new_back, 0, front_buf, 0, len(new_back))
+        self.buffer = new_back
+        self.framebuf = self._fbs[self._back]
+        self._flush_buf = front_buf
+        self._force_next = force
+        self.frames_presented += 1
+        self._ready = 1  # publish last: the worker only looks at the rest once this is set
+        return True
+
+    def _worker(self):
+        try:
+            while self._running:
+                if not self._ready:
+                    _nap()
+                    continue
+                try:
+                    self._flush_frame(self._force_next)
+                except OSError as e:
+                    # bus error left after the resends: remember it, the
+                    # next frame resends everything
+                    self.async_error = e
+                    self.invalidate()
+                self._ready = 0
+        except Exception as e:
+            # anything else ends the worker; sync()/present() raise it
+            self._worker_exc = e
+        finally:
+            self._ready = 0
+            self._worker_alive = False
+
+    # --- bus-traffic stats ---
+    def enable_stats(self, on=True):
+        # Off, the write_*/show methods are the plain class methods, so units
+        # can ship with this compiled in at zero cost. On, instance attributes
+        # shadow them with wrappers that count transactions, bytes and
+        # microseconds. A wrapped call that made no nested counted call is one
+        # bus transaction, so cmd_batch=False / default write_burst() loops are
+        # counted per byte/part without double counting.
+        if not on:
+            for name in _STAT_WRAPPED:
+                try:
+                    delattr(self, name)
+                except AttributeError:
+                    pass
+            self.stats_on = False
+            return
+        if self.stats_on:
+            return
+        self.stats_on = True
+        st = self._stats
+        cls = type(self)
+
+        def wrap_bus(name, kind, size):
+            orig = getattr(cls, name)
+            b_key = kind + "_bytes"
+            us_key = kind + "_us"
+            max_key = kind + "_max"
+
+            def bus_call(arg):
+                tx = st["tx"]
+                t0 = ticks_us()
+                orig(self, arg)
+                if st["tx"] == tx:
+                    dt = ticks_diff(ticks_us(), t0)
+                    st["tx"] = tx + 1
+                    st[b_key] += size(arg)
+                    st[us_key] += dt
+                    if dt > st[max_key]:
+                        st[max_key] = dt
+            setattr(self, name, bus_call)
+
+        def burst_size(vec):
+            n = 0
+            for i in range(1, len(vec)):
+                n += len(vec[i])
+            return n
+
+        wrap_bus("write_cmd", "cmd", lambda c: 1)
+        wrap_bus("write_cmds", "cmd", len)
+        wrap_bus("write_data", "data", len)
+        wrap_bus("write_wire", "data", lambda b: len(b) - (1 - self._wire_skip))
+        wrap_bus("write_burst", "data", burst_size)
+
+        def flush_done(t0):
+            dt = ticks_diff(ticks_us(), t0)
+            st["flushes"] += 1
+            st["show_us"] += dt
+            if dt > st["show_max"]:
+                st["show_max"] = dt
+
+        show = cls.show
+        show_region = cls.show_region
+
+        def timed_show(force=False):
+            t0 = ticks_us()
+            show(self, force)
+            flush_done(t0)
+
+        def timed_region(x, y, w, h):
+            t0 = ticks_us()
+            show_region(self, x, y, w, h)
+            flush_done(t0)
+        self.show = timed_show
+        self.show_region = timed_region
+
+        flush_page = cls._flush_page
+
+        def counted_page(page, x0, x1, force):
+            tx = st["tx"]
+            flush_page(self, page, x0, x1, force)
+            if st["tx"] == tx:
+                st["pages_skipped"] += 1
+            else:
+                st["pages_sent"] += 1
+        self._flush_page = counted_page
+
+        show_burst = getattr(cls, "_show_burst", None)
+        if show_burst is not None:
+            def counted_burst():
+                show_burst(self)
+                st["pages_sent"] += self.pages
+            self._show_burst = counted_burst
+
+    def reset_stats(self):
+        # In place: the wrappers hold on to this dict
+        for key in _STAT_KEYS:
+            self._stats[key] = 0
+
+    def stats(self):
+        return dict(self._stats)
+
+    def stats_line(self):
+        # Compact one-line dump for the REPL: pages=sent/visited,
+        # cmd_us/data_us=total/max, show_us=avg/max per flush
+        st = self._stats
+        n = st["flushes"] or 1
+        return ("tx=%d cmd=%dB data=%dB flush=%d pages=%d/%d "
+                "cmd_us=%d/%d data_us=%d/%d show_us=%d/%d" % (
+                    st["tx"], st["cmd_bytes"], st["data_bytes"], st["flushes"],
+                    st["pages_sent"], st["pages_sent"] + st["pages_skipped"],
+                    st["cmd_us"], st["cmd_max"], st["data_us"], st["data_max"],
+                    st["show_us"] // n, st["show_max"]))
+
+    def write_cmd(self, cmd):
+        raise NotImplementedError
+
+    def write_cmds(self, seq):
+        # Default: one transaction per byte; transports override to batch
+        for cmd in seq:
+            self.write_cmd(cmd)
+
+    def write_data(self, buf):
+        raise NotImplementedError
+
+    def write_wire(self, wbuf):
+        # wbuf is a wire view: 0x40 control byte + data, or data only when the
+        # transport sets _wire_skip = 1
+        if self._wire_skip:
+            self.write_data(wbuf)
+        else:
+            self.write_data(memoryview(wbuf)[1:])
+
+    def write_burst(self, vec):
+        # vec = [0x40 control byte, data views...]; default sends them one by one
+        # (horizontal addressing keeps the column pointer running between them)
+        for i in range(1, len(vec)):
+            self.write_data(vec[i])
+
+
+class I2CMixin:
+    # I2C transport: list it before the controller class,
+    # e.g. class SSD1306_I2C(I2CMixin, SSD1306), and call _init_i2c() first.
+    def _init_i2c(self, i2c, addr, cmd_batch):
+        self.i2c = i2c
+        # a bus that steps its rate down on errors (i2ctune.TunedI2C) says
+        # how many failures in a row are worth resending
+        self.bus_retries = getattr(i2c, "retries", 0)
+        self.addr = addr
+        self.cmd_batch = cmd_batch  # False: one command byte per transaction (bad clones)
+        self._tmp = bytearray(2)
+        self._vec = [b"\x40", None]  # reused writevto vector for write_data()
+        self._cmdvec = [b"\x00", None]  # same for write_cmds(): Co=0, D/C#=0
+
+    def write_cmd(self, cmd):
+        self._tmp[0] = 0x80
+        self._tmp[1] = cmd & 0xFF
+        n = self.bus_retries
+        while True:
+            try:
+                self.i2c.writeto(self.addr, self._tmp)
+                return
+            except OSError:
+                # a command transaction stands alone: resend it as it is
+                if n <= 0:
+                    raise
+                n -= 1
+
+    def write_cmds(self, seq):
+        # ONE transaction: 0x00 control byte followed by every command byte
+        if not self.cmd_batch:
+            for cmd in seq:
+                self.write_cmd(cmd)
+            return
+        vec = self._cmdvec
+        vec[1] = seq
+        n = self.bus_retries
+        while True:
+            try:
+                self.i2c.writevto(self.addr, vec)
+                break
+            except OSError:
+                if n <= 0:
+                    vec[1] = None
+                    raise
+                n -= 1
+        vec[1] = None
+
+    def write_data(self, buf):
+        # ONE transaction; required by many clone panels
+        vec = self._vec
+        vec[1] = buf
+        self.i2c.writevto(self.addr, vec)
+        vec[1] = None
+
+    def write_wire(self, wbuf):
+        # Control byte already in place: straight from the preallocated buffer
+        self.i2c.writeto(self.addr, wbuf)
+
+    def write_burst(self, vec):
+        # ONE transaction for the whole vector (control byte + page views)
+        self.i2c.writevto(self.addr, vec)
+
+
+class SPIMixin:
+    # 4-wire SPI transport: DC low = commands, DC high = data, each write one
+    # CS-framed burst. The bus is set up once by the caller (8-10 MHz+ works
+    # on most modules); cs/res may be None when tied off on the board.
+    # List it before the controller class, e.g.
+    # class SSD1306_SPI(SPIMixin, SSD1306), and call _init_spi() first.
+    _wire_skip = 1  # no 0x40 control byte on SPI
+
+    def _init_spi(self, spi, dc, res, cs):
+        dc.init(dc.OUT, value=0)
+        if res is not None:
+            res.init(res.OUT, value=1)
+        if cs is not None:
+            cs.init(cs.OUT, value=1)
+        self.spi = spi
+        self.dc = dc
+        self.res = res
+        self.cs = cs
+        self._cmd1 = bytearray(1)
+
+    def poweron(self):
+        # Reset pulse when RES is wired
+        if self.res is not None:
+            self.res(1)
+            _sleep_ms(1)
+            self.res(0)
+            _sleep_ms(10)
+            self.res(1)
+
+    def _spi_send(self, dc, buf):
+        cs = self.cs
+        self.dc(dc)
+        if cs is not None:
+            cs(0)
+        self.spi.write(buf)
+        if cs is not None:
+            cs(1)
+
+    def write_cmd(self, cmd):
+        self._cmd1[0] = cmd & 0xFF
+        self._spi_send(0, self._cmd1)
+
+    def write_cmds(self, seq):
+        # No per-byte control bytes on SPI: the whole sequence is one burst
+        self._spi_send(0, seq)
+
+    def write_data(self, buf):
+        self._spi_send(1, buf)
+
+    def write_wire(self, wbuf):
+        # Views already start after the control byte (_wire_skip)
+        self._spi_send(1, wbuf)
+
+    def write_burst(self, vec):
+        # vec[0] is the I2C control byte; the data views go out in one CS frame
+        cs = self.cs
+        self.dc(1)
+        if cs is not None:
+            cs(0)
+        for i in range(1, len(vec)):
+            self.spi.write(vec[i])
+        if cs is not None:
+            cs(1)
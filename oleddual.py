@@ -0,0 +1,169 @@
+# oleddual.py
+# Two 128x64 panels (SSD1306 / SH1106 drivers from this repo) as one canvas.
+#
+#   top = ssd1306.SSD1306_I2C(128, 64, I2C(0, ...))
+#   bot = ssd1306.SSD1306_I2C(128, 64, I2C(1, ...))
+#   oled = DualDisplay(top, bot, STACK)      # 128x128, bot below top
+#   oled = DualDisplay(left, right, SIDE)    # 256x64, right next to left
+#
+# Drawing goes to one MONO_VLSB FrameBuffer. show() splits it into each panel's
+# page buffer and flushes both with the panels' own dirty tracking. STACK needs
+# no copy at all: the panels' page buffers are views into the canvas. SIDE
+# copies 8 rows of 128 bytes per panel.
+#
+# When the panels sit on different buses (I2C0 + I2C1, or two SPI ports) the
+# second panel is flushed by a worker (core 1 on the Pico) while the caller
+# flushes the first, so a frame costs about as much as one panel. Two panels
+# at 0x3C/0x3D on one bus are flushed one after the other.
+
+import framebuf
+from oledcore import _copy, _spawn, _nap
+
+STACK = 0  # b below a: 128x128
+SIDE  = 1  # b right of a: 256x64
+
+
+def _bus(panel):
+    return getattr(panel, "i2c", None) or getattr(panel, "spi", None)
+
+
+class DualDisplay:
+    def __init__(self, a, b, layout=STACK, parallel=None):
+        if a.width != b.width or a.height != b.height:
+            raise ValueError("panels must be the same size")
+        if a.pbuffer is not None or b.pbuffer is not None:
+            raise ValueError("build the panels with rotation=0")
+        self.panels = (a, b)
+        self.layout = layout
+        pw = a.width
+        ph = a.height
+        if layout == STACK:
+            self.width, self.height = pw, ph * 2
+        elif layout == SIDE:
+            self.width, self.height = pw * 2, ph
+        else:
+            raise ValueError("layout must be STACK or SIDE")
+        self.pages = self.height // 8
+        self.buffer = bytearray(self.width * self.pages)
+        self.framebuf = framebuf.FrameBuffer(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
+
+        # the panels are flushed from here, not through their own workers
+        a.stop_async()
+        b.stop_async()
+        if layout == STACK:
+            # page-major buffer: the top half of the canvas *is* panel a's pages
+            n = len(a.buffer)
+            mv = memoryview(self.buffer)
+            a.buffer = a._flush_buf = mv[:n]
+            b.buffer = b._flush_buf = mv[n:]
+
+        if parallel is None:
+            parallel = _bus(a) is not _bus(b)
+        self.parallel = parallel
+        self._go = 0          # 1 = worker owns panel b for this frame
+        self._force = False
+        self._error = None
+        self._running = False
+        self._worker_alive = False
+
+    # Drawing proxies
+    def fill(self, col): self.framebuf.fill(col)
+    def pixel(self, x, y, col): self.framebuf.pixel(x, y, col)
+    def scroll(self, dx, dy): self.framebuf.scroll(dx, dy)
+    def text(self, s, x, y, col=1): self.framebuf.text(s, x, y, col)
+    def rect(self, x, y, w, h, col): self.framebuf.rect(x, y, w, h, col)
+    def fill_rect(self, x, y, w, h, col): self.framebuf.fill_rect(x, y, w, h, col)
+    def blit(self, fbuf, x, y): self.framebuf.blit(fbuf, x, y)
+    def hline(self, x, y, w, col): self.framebuf.hline(x, y, w, col)
+    def vline(self, x, y, h, col): self.framebuf.vline(x, y, h, col)
+    def line(self, x0, y0, x1, y1, col): self.framebuf.line(x0, y0, x1, y1, col)
+
+    def _split(self):
+        # SIDE: canvas rows are 256 bytes per page, panels want 128
+        if self.layout != SIDE:
+            return
+        a, b = self.panels
+        pw = a.width
+        buf = self.buffer
+        for page in range(self.pages):
+            src = page * self.width
+            _copy(a.buffer, page * pw, buf, src, pw)
+            _copy(b.buffer, page * pw, buf, src + pw, pw)
+
+    def show(self, force=False):
+        self._split()
+        a, b = self.panels
+        if not self.parallel:
+            a._flush_frame(force)
+            b._flush_frame(force)
+            return
+        if not self._running:
+            self._running = True
+            self._worker_alive = True
+            _spawn(self._worker)
+        self._force = force
+        self._go = 1  # publish last
+        try:
+            a._flush_frame(force)
+        finally:
+            while self._go:
+                _nap()
+        err = self._error
+        if err is not None:
+            self._error = None
+            raise err
+
+    def _worker(self):
+        b = self.panels[1]
+        try:
+            while self._running:
+                if not self._go:
+                    _nap()
+                    continue
+                try:
+                    b._flush_frame(self._force)
+                except Exception as e:
+                    # hand it to show() (bus error or not); b resends
+                    # everything next frame
+                    self._error = e
+                    b.invalidate()
+                self._go = 0
+        finally:
+            # never leave show() waiting on a dead worker; it respawns one
+            self._go = 0
+            self._running = False
+            self._worker_alive = False
+
+    def stop(self):
+        # End the flush worker (e.g. before handing core 1 to something else)
+        self._running = False
+        while self._worker_alive:
+            _nap()
+
+    def show_region(self, x, y, w, h):
+        # Flush only the rectangle the caller knows it touched, on each
+        # panel it overlaps (sequentially: regions are small)
+        self._split()
+        a, b = self.panels
+        if self.layout == STACK:
+            a.show_region(x, y, w, h)
+            b.show_region(x, y - a.height, w, h)
+        else:
+            a.show_region(x, y, w, h)
+            b.show_region(x - a.width, y, w, h)
+
+    def invalidate(self):
+        for panel in self.panels:
+            panel.invalidate()
+
+    def contrast(self, contrast):
+        for panel in self.panels:
+            panel.contrast(contrast)
+
+    def invert(self, invert):
+        for panel in self.panels:
+            panel.invert(invert)
+
+    def poweroff(self):
+        for panel in self.panels:
+            panel.poweroff()
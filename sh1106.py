@@ -0,0 +1,80 @@
+# sh1106.py
+# SH1106 I2C driver for 128x64 OLEDs (132-column RAM, visible area at COL_OFFSET).
+# Drop-in for the games' old sh1106 module: SH1106_I2C(128, 64, i2c, rotate=90).
+#
+# Shares the SSD1306 core (oledcore.py): dirty-page / column-run flushing,
+# wire-ready page buffer, batched commands, async present() and the portrait
+# surface. rotate=90/270 draws on a 64x128 framebuf and show() block-transposes
+# it, instead of rotating pixel by pixel.
+#
+# The SH1106 only has page addressing and no scroll engine, so there is no
+# addr_mode / hw_scroll_* here.
+#
+# SH1106_SPI(width, height, spi, dc, res=None, cs=None, rotate=0) is the
+# 4-wire SPI variant.
+
+from oledcore import OLEDCore, I2CMixin, SPIMixin, _sleep_ms
+
+
+class SH1106(OLEDCore):
+    def init_display(self):
+        self.write_cmds(bytes((
+            0xAE,             # display off
+            0xD5, 0x80,       # clock divide
+            0xA8, 0x3F,       # multiplex 1/64
+            0xD3, 0x00,       # display offset
+            0x40,             # start line
+            0xAD, 0x8A if self.external_vcc else 0x8B,  # DC-DC control
+            0xA1,             # seg remap
+            0xC8,             # COM scan dir
+            0xDA, 0x12,       # com pins
+            0x81, 0xCF,       # contrast
+            0xD9, 0x22 if self.external_vcc else 0x1F,  # precharge
+            0xDB, 0x40,       # vcom detect
+            0xA4,             # display follows RAM
+            0xA6,             # normal
+            0xAF              # display on
+        )))
+
+        # Same RAM scrub as the SSD1306 path: hidden columns start at zero
+        self._clear_controller_ram()
+
+        # No blank frame on top: the scrubbed pages are invalid, so the first
+        # show() (the logo at boot) sends all of them in full anyway
+        self.fill(0)
+
+
+class SH1106_I2C(I2CMixin, SH1106):
+    def __init__(self, width, height, i2c, res=None, addr=0x3C, rotate=0,
+                 external_vcc=False, delay=0, cmd_batch=True, warm=False):
+        self._init_i2c(i2c, addr, cmd_batch)
+        self.res = res
+        self.delay = delay
+        if res is not None:
+            res.init(res.OUT, value=1)
+        SH1106.__init__(self, width, height, external_vcc, rotate, warm)
+
+    def poweron(self):
+        # Optional reset pulse, then give the charge pump time to settle
+        if self.res is not None:
+            self.res(1)
+            _sleep_ms(1)
+            self.res(0)
+            _sleep_ms(20)
+            self.res(1)
+            _sleep_ms(20)
+        if self.delay:
+            _sleep_ms(self.delay)
+
+
+class SH1106_SPI(SPIMixin, SH1106):
+    def __init__(self, width, height, spi, dc, res=None, cs=None, rotate=0,
+                 external_vcc=False, delay=0, warm=False):
+        self._init_spi(spi, dc, res, cs)
+        self.delay = delay
+        SH1106.__init__(self, width, height, external_vcc, rotate, warm)
+
+    def poweron(self):
+        SPIMixin.poweron(self)
+        if self.delay:
+            _sleep_ms(self.delay)
@@ -1,47 +1,89 @@
 # ssd1306.py
-# Clone-friendly SSD1306 I2C driver for 128x64 OLEDs with 132-column RAM mapping.
-# Fixes "random dots/lines" that appear after showing an image by:
-# - Writing full 132 bytes per page every frame
-# - Offsetting the visible 128 columns by COL_OFFSET=4
-# - Forcing hidden columns to zero every time
-# - Sending data as ONE I2C transaction (required by many clone panels)
+# Clone-friendly SSD1306 driver for 128x64 OLEDs with 132-column RAM mapping
+# (visible area at COL_OFFSET, hidden columns kept zero).
+#
+# Buffers, dirty-page / column-run flushing, rotation, async present(), warm
+# attach, stats and the I2C / SPI transports live in oledcore.py (shared with
+# sh1106.py). This file adds what only the SSD1306 has:
+#
+# - init_display(): the MicroPython-standard init, then a RAM scrub
+# - addr_mode=ADDR_HORIZONTAL: full-frame flushes (boot, force, invalidated
+#   pages) set the column/page window once and stream the frame in one
+#   transaction (or burst_pages-sized chunks). full_ram=True windows all 132
+#   RAM columns, full_ram=False only the visible ones. bench_flush() times
+#   page vs horizontal mode on the real panel.
+# - Hardware scrolling (hw_scroll_start/hw_scroll_stop/hw_scroll_step) moves a
+#   page range without sending pixels. While a continuous scroll runs, show()
+#   leaves those pages alone; stopping it marks them for a resend. One-shot
+#   steps shift the shadow too, so the next show() only sends the column that
+#   scrolled in.
+# - Gray4(display): 4 gray levels by cycling two bitplanes (hi, hi, lo) at a
+#   paced rate; pgm_to_planes() converts 8-bit PGM art, bench_gray() reports
+#   the plane rate the panel/bus actually reaches.
+#
+# SSD1306_I2C(width, height, i2c, addr=0x3C) / SSD1306_SPI(width, height,
+# spi, dc, res, cs); rotation=90 gives the 64x128 portrait surface.
 
 import framebuf
+from oledcore import (
+    OLEDCore, I2CMixin, SPIMixin, _copy, _spawn, _nap, ticks_us, ticks_diff, ticks_add,
+    RAM_COLS, COL_OFFSET, WIRE_STRIDE, PRESENT_WAIT, PRESENT_DROP,
+)
 
-RAM_COLS   = 132
-COL_OFFSET = 2  # your proven-good offset
+# Memory addressing modes (value of command 0x20)
+ADDR_HORIZONTAL = 0x00
+ADDR_PAGE       = 0x02
 
+# Continuous scroll step interval (frames), 3-bit code for 0x26/0x27/0x29/0x2A
+SCROLL_2   = 0b111
+SCROLL_3   = 0b100
+SCROLL_4   = 0b101
+SCROLL_5   = 0b000
+SCROLL_25  = 0b110
+SCROLL_64  = 0b001
+SCROLL_128 = 0b010
+SCROLL_256 = 0b011
 
-class SSD1306:
-    def __init__(self, width, height, external_vcc=False):
-        self.width = width
-        self.height = height
-        self.external_vcc = external_vcc
-        self.pages = self.height // 8
 
-        # Standard 128x64 framebuffer
-        self.buffer = bytearray(self.width * self.pages)
-        self.framebuf = framebuf.FrameBuffer(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
+class SSD1306(OLEDCore):
+    def __init__(self, width, height, external_vcc=False,
+                 addr_mode=ADDR_PAGE, full_ram=True, burst_pages=0, rotation=0, warm=False):
+        self.addr_mode = addr_mode
+        self._full_ram = full_ram
+        self._burst_pages = burst_pages
+        self._scroll_vertical = False
+        self._win_cmd = bytearray(6)  # 0x21/0x22 window
+        OLEDCore.__init__(self, width, height, external_vcc, rotation, warm)
 
-        # One reusable line buffer for page writes (132 bytes)
-        self._line = bytearray(RAM_COLS)
-
-        self.poweron()
-        self.init_display()
-
-    def poweron(self):
-        pass
+    def _prepare(self):
+        # Horizontal-mode column window and prebuilt burst vectors:
+        # one [0x40, page views...] vector per burst_pages chunk (0 = whole frame),
+        # and a [0x40, page view] vector per page for single-page writes.
+        if self._full_ram:
+            self._hcol0, self._hcol1 = 0, RAM_COLS - 1
+        else:
+            self._hcol0, self._hcol1 = COL_OFFSET, COL_OFFSET + self.width - 1
+        wire_mv = memoryview(self._wire)
+        a = 1 + self._hcol0
+        b = 2 + self._hcol1
+        hviews = [wire_mv[p * WIRE_STRIDE + a:p * WIRE_STRIDE + b] for p in range(self.pages)]
+        self._hpage_vecs = tuple([b"\x40", v] for v in hviews)
+        step = self._burst_pages or self.pages
+        bursts = []
+        for p0 in range(0, self.pages, step):
+            bursts.append([b"\x40"] + hviews[p0:p0 + step])
+        self._bursts = tuple(bursts)
 
     def init_display(self):
         # MicroPython-standard SSD1306 init; PAGE addressing mode
-        for cmd in (
+        self.write_cmds(bytes((
             0xAE,             # display off
             0xD5, 0x80,       # clock divide
             0xA8, 0x3F,       # multiplex 1/64
             0xD3, 0x00,       # display offset
             0x40,             # start line
             0x8D, 0x14,       # charge pump
-            0x20, 0x02,       # memory mode = Page Addressing Mode
+            0x20, self.addr_mode,  # memory mode (default Page Addressing Mode)
             0xA1,             # seg remap
             0xC8,             # COM scan dir
             0xDA, 0x12,       # com pins
@@ -51,85 +93,382 @@ class SSD1306:
             0xA4,             # display follows RAM
             0xA6,             # normal
             0xAF              # display on
-        ):
-            self.write_cmd(cmd)
+        )))
 
         # Hard scrub the controller RAM so the first image can't leave residue
         self._clear_controller_ram()
 
+        # No blank frame on top: the scrubbed pages are invalid, so the first
+        # show() (the logo at boot) sends all of them in full anyway
         self.fill(0)
-        self.show()
 
-    def _clear_controller_ram(self):
-        # Force all pages, all 132 columns to 0 once at boot.
-        # This prevents "appears after logo" ghost junk.
-        zeros = b"\x00" * RAM_COLS
+    def _attach_cmds(self):
+        return bytes((
+            0x2E,             # scrolling off
+            0x40,             # start line (vertical scroll moves it)
+            0x20, self.addr_mode,  # memory mode
+            0xA6,             # normal
+            0x81, 0xCF,       # contrast
+            0xAF              # display on
+        ))
+
+    def set_addr_mode(self, mode):
+        # Switch page/horizontal addressing at runtime; next show() re-sends all
+        self.sync()
+        cmd = self._cmd2
+        cmd[0] = 0x20
+        cmd[1] = mode
+        self.write_cmds(cmd)
+        self.addr_mode = mode
+        self.invalidate()
+
+    def _set_window(self, page0, page1, col0, col1):
+        # Horizontal/vertical mode addressing: 0x21 col range, 0x22 page range
+        cmd = self._win_cmd
+        cmd[0] = 0x21
+        cmd[1] = col0
+        cmd[2] = col1
+        cmd[3] = 0x22
+        cmd[4] = page0
+        cmd[5] = page1
+        self.write_cmds(cmd)
+
+    def _set_page_col(self, page, col):
+        if self.addr_mode == ADDR_HORIZONTAL:
+            self._set_window(page, page, col, self._hcol1)
+        else:
+            OLEDCore._set_page_col(self, page, col)
+
+    def _write_full_page(self, page):
+        # Horizontal mode: window the page and send it as one burst
+        if self.addr_mode != ADDR_HORIZONTAL:
+            OLEDCore._write_full_page(self, page)
+            return
+        _copy(self._wire, page * WIRE_STRIDE + 1 + COL_OFFSET,
+              self._flush_buf, page * self.width, self.width)
+        self._set_window(page, page, self._hcol0, self._hcol1)
+        self.write_burst(self._hpage_vecs[page])
+        self._page_ok[page] = 1
+
+    def _show_burst(self):
+        # Horizontal mode full frame: window set once, then 1..N big transactions
+        wire = self._wire
+        buf = self._flush_buf
         for page in range(self.pages):
-            self.write_cmd(0xB0 + page)
-            self.write_cmd(0x00)  # col low = 0
-            self.write_cmd(0x10)  # col high = 0
-            self.write_data(zeros)
-
-    def poweroff(self):
-        self.write_cmd(0xAE)
-
-    def contrast(self, contrast):
-        self.write_cmd(0x81)
-        self.write_cmd(contrast & 0xFF)
-
-    def invert(self, invert):
-        self.write_cmd(0xA7 if invert else 0xA6)
-
-    # --- drawing proxies ---
-    def fill(self, col): self.framebuf.fill(col)
-    def pixel(self, x, y, col): self.framebuf.pixel(x, y, col)
-    def scroll(self, dx, dy): self.framebuf.scroll(dx, dy)
-    def text(self, s, x, y, col=1): self.framebuf.text(s, x, y, col)
-    def rect(self, x, y, w, h, col): self.framebuf.rect(x, y, w, h, col)
-    def fill_rect(self, x, y, w, h, col): self.framebuf.fill_rect(x, y, w, h, col)
-    def blit(self, fbuf, x, y): self.framebuf.blit(fbuf, x, y)
-
-    def show(self):
-        # For each page:
-        # - Set column to 0
-        # - Build a 132-byte line of zeros
-        # - Copy the 128 framebuffer bytes into columns 4..131
-        # - Send the 132 bytes in ONE I2C transaction
+            _copy(wire, page * WIRE_STRIDE + 1 + COL_OFFSET,
+                  buf, page * self.width, self.width)
+        self._set_window(0, self.pages - 1, self._hcol0, self._hcol1)
+        for vec in self._bursts:
+            self.write_burst(vec)
         for page in range(self.pages):
-            self.write_cmd(0xB0 + page)
-            self.write_cmd(0x00)  # col low = 0
-            self.write_cmd(0x10)  # col high = 0
+            self._page_ok[page] = 1
+
+    def _show_pages(self, force):
+        if (self.addr_mode == ADDR_HORIZONTAL and self._scroll_lo > self._scroll_hi
+                and (force or b"\x00" in self._page_ok)):
+            self._show_burst()
+        else:
+            OLEDCore._show_pages(self, force)
+
+    # --- hardware scrolling ---
+    def hw_scroll_start(self, right=True, page0=0, page1=None, step=SCROLL_2,
+                        voffset=0, fixed_rows=0, scroll_rows=None):
+        # Continuous scroll of pages page0..page1. voffset != 0 adds vertical
+        # scrolling (0x29/0x2A) inside the fixed_rows/scroll_rows area (0xA3).
+        if page1 is None:
+            page1 = self.pages - 1
+        self.sync()
+        if self._scroll_lo <= self._scroll_hi:
+            self.hw_scroll_stop()
+        if voffset:
+            if scroll_rows is None:
+                scroll_rows = self.height - fixed_rows
+            self.write_cmds(bytes((
+                0xA3, fixed_rows, scroll_rows,
+                0x29 if right else 0x2A, 0x00, page0, step, page1, voffset & 0x3F,
+                0x2F,
+            )))
+            # the whole display moves vertically
+            self._scroll_lo, self._scroll_hi = 0, self.pages - 1
+            self._scroll_vertical = True
+        else:
+            self.write_cmds(bytes((
+                0x26 if right else 0x27, 0x00, page0, step, page1, 0x00, 0xFF,
+                0x2F,
+            )))
+            self._scroll_lo, self._scroll_hi = page0, page1
+            self._scroll_vertical = False
+
+    def hw_scroll_stop(self):
+        # Deactivate scrolling; the controller wants scrolled RAM rewritten,
+        # so the pages it owned go back to "unknown" and the next show() resends them.
+        if self._scroll_lo > self._scroll_hi:
+            return
+        self.sync()
+        if self._scroll_vertical:
+            self.write_cmds(b"\x2e\x40")  # stop + start line back to 0
+        else:
+            self.write_cmds(b"\x2e")
+        for page in range(self._scroll_lo, self._scroll_hi + 1):
+            self._page_ok[page] = 0
+        self._scroll_lo, self._scroll_hi = 1, 0
+        self._scroll_vertical = False
+
+    def hw_scroll_step(self, right=True, page0=0, page1=None, x0=0, x1=None):
+        # One-shot content scroll by one column (0x2C/0x2D) of pages page0..page1,
+        # visible columns x0..x1-1. The shadow is shifted the same way, and the
+        # column that scrolls in is marked dirty so show() sends only that.
+        # Call it once per frame, after drawing the scrolled frame and right
+        # before show(). (0x2C/0x2D are on SSD1306B/SSD1315-class controllers,
+        # not every clone.)
+        if page1 is None:
+            page1 = self.pages - 1
+        if x1 is None:
+            x1 = self.width
+        self.sync()
+        self.write_cmds(bytes((
+            0x2C if right else 0x2D, 0x00, page0, 0x01, page1,
+            COL_OFFSET + x0, COL_OFFSET + x1 - 1,
+        )))
+        self._rotate()
+        wire = self._wire
+        buf = self.buffer
+        for page in range(page0, page1 + 1):
+            base = page * WIRE_STRIDE + 1 + COL_OFFSET
+            if right:
+                wire[base + x0 + 1:base + x1] = wire[base + x0:base + x1 - 1]
+                edge = x0
+            else:
+                wire[base + x0:base + x1 - 1] = wire[base + x0 + 1:base + x1]
+                edge = x1 - 1
+            # force a mismatch so the next show() writes the new edge column
+            wire[base + edge] = buf[page * self.width + edge] ^ 0xFF
+
+
+class SSD1306_I2C(I2CMixin, SSD1306):
+    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False, cmd_batch=True,
+                 addr_mode=ADDR_PAGE, full_ram=True, burst_pages=0, rotation=0, warm=False):
+        self._init_i2c(i2c, addr, cmd_batch)
+        SSD1306.__init__(self, width, height, external_vcc, addr_mode, full_ram, burst_pages, rotation,
+                         warm)
+
+
+class SSD1306_SPI(SPIMixin, SSD1306):
+    # Same COL_OFFSET / 132-column layout; every page write is one SPI burst
+    def __init__(self, width, height, spi, dc, res, cs, external_vcc=False,
+                 addr_mode=ADDR_PAGE, full_ram=True, burst_pages=0, rotation=0, warm=False):
+        self._init_spi(spi, dc, res, cs)
+        SSD1306.__init__(self, width, height, external_vcc, addr_mode, full_ram, burst_pages, rotation,
+                         warm)
+
+
+def bench_flush(display, frames=20):
+    # Average microseconds per forced full flush in page mode vs horizontal
+    # burst mode, measured on the real panel. Restores the original mode.
+    import time
+    mode = display.addr_mode
+    result = {}
+    for name, m in (("page", ADDR_PAGE), ("horizontal", ADDR_HORIZONTAL)):
+        display.set_addr_mode(m)
+        display.show(force=True)  # warm-up
+        t0 = time.ticks_us()
+        for _ in range(frames):
+            display.show(force=True)
+        result[name] = time.ticks_diff(time.ticks_us(), t0) // frames
+    display.set_addr_mode(mode)
+    display.show(force=True)
+    return result
+
+
+# --- 4-level grayscale ---
+# Level = 2*hi + lo. Each cycle shows hi, hi, lo, so a pixel is lit 0/3, 1/3,
+# 2/3 or 3/3 of the time. Consecutive hi frames cost nothing (dirty tracking)
+# and pages where both planes agree never re-flush, so only the gray regions
+# go over the bus. It needs a steady plane rate (~150/s and up) to not flicker.
+
+class Gray4:
+    def __init__(self, display):
+        if display.pbuffer is not None:
+            raise ValueError("grayscale needs rotation=0")
+        display.stop_async()
+        self.display = display
+        self.width = display.width
+        self.height = display.height
+        n = len(display.buffer)
+        self.hi = bytearray(n)
+        self.lo = bytearray(n)
+        self.fb_hi = framebuf.FrameBuffer(self.hi, self.width, self.height, framebuf.MONO_VLSB)
+        self.fb_lo = framebuf.FrameBuffer(self.lo, self.width, self.height, framebuf.MONO_VLSB)
+        self._cycle = (self.hi, self.hi, self.lo)
+        self._phase = 0
+        self.period_us = 0
+        self._running = False
+        self._worker_alive = False
+        self.reset_timing()
+
+    # Drawing, level 0..3
+    def fill(self, level):
+        self.fb_hi.fill(level >> 1)
+        self.fb_lo.fill(level & 1)
+
+    def pixel(self, x, y, level):
+        self.fb_hi.pixel(x, y, level >> 1)
+        self.fb_lo.pixel(x, y, level & 1)
+
+    def fill_rect(self, x, y, w, h, level):
+        self.fb_hi.fill_rect(x, y, w, h, level >> 1)
+        self.fb_lo.fill_rect(x, y, w, h, level & 1)
+
+    def text(self, s, x, y, level=3):
+        self.fb_hi.text(s, x, y, level >> 1)
+        self.fb_lo.text(s, x, y, level & 1)
+
+    def load_pgm(self, path, x0=0, y0=0):
+        w, h, hi, lo = pgm_to_planes(path)
+        if (x0, y0, w, h) == (0, 0, self.width, self.height):
+            _copy(self.hi, 0, hi, 0, len(hi))
+            _copy(self.lo, 0, lo, 0, len(lo))
+        else:
+            self.fb_hi.blit(framebuf.FrameBuffer(hi, w, h, framebuf.MONO_VLSB), x0, y0)
+            self.fb_lo.blit(framebuf.FrameBuffer(lo, w, h, framebuf.MONO_VLSB), x0, y0)
+
+    # Flushing
+    def reset_timing(self):
+        self.flushes = 0
+        self.flush_us = 0      # cumulative
+        self.flush_max = 0
+        self.late_max = 0      # worst start past its slot (paced mode)
+        self.missed = 0        # slots lost because a flush overran the period
+
+    def timing(self):
+        n = self.flushes or 1
+        return {"flushes": self.flushes, "flush_avg": self.flush_us // n,
+                "flush_max": self.flush_max, "late_max": self.late_max,
+                "missed": self.missed, "period_us": self.period_us}
+
+    def step(self):
+        # Flush the next plane of the cycle; returns its flush time in us
+        d = self.display
+        d._flush_buf = self._cycle[self._phase]
+        self._phase = (self._phase + 1) % 3
+        t0 = ticks_us()
+        d._flush_frame(False)
+        dt = ticks_diff(ticks_us(), t0)
+        self.flushes += 1
+        self.flush_us += dt
+        if dt > self.flush_max:
+            self.flush_max = dt
+        return dt
 
-            start = self.width * page
-            end = start + self.width
+    def _pace(self, end=None):
+        # Fixed cadence: busy-wait to each slot so the duty cycle stays even.
+        # Runs until stop(), or until the end tick when given.
+        period = self.period_us
+        slot = ticks_us()
+        while self._running:
+            if end is not None and ticks_diff(end, slot) <= 0:
+                break
+            self.step()
+            slot = ticks_add(slot, period)
+            late = ticks_diff(ticks_us(), slot)
+            if late > self.late_max:
+                self.late_max = late
+            if late >= period:
+                # overran a whole slot: resync instead of bursting to catch up
+                self.missed += late // period
+                slot = ticks_us()
+                continue
+            while ticks_diff(slot, ticks_us()) > 0:
+                pass
 
-            line = self._line
-            # zero hidden + visible columns
-            for i in range(RAM_COLS):
-                line[i] = 0
+    def run(self, ms, rate=180):
+        # Blocking: show the planes for ms milliseconds at rate planes/s
+        self.period_us = 1000000 // rate
+        self._running = True
+        self._pace(ticks_add(ticks_us(), ms * 1000))
+        self._running = False
 
-            line[COL_OFFSET:COL_OFFSET + self.width] = self.buffer[start:end]
-            self.write_data(line)
+    def start(self, rate=180):
+        # Paced flusher on a worker (core 1 on the Pico); drawing keeps going here
+        self.period_us = 1000000 // rate
+        if self._running:
+            return
+        self._running = True
+        self._worker_alive = True
+        _spawn(self._worker)
 
-    def write_cmd(self, cmd):
-        raise NotImplementedError
+    def _worker(self):
+        try:
+            self._pace()
+        finally:
+            self._worker_alive = False
 
-    def write_data(self, buf):
-        raise NotImplementedError
+    def stop(self):
+        # Back to normal 1-bit show(); the shadow still describes the panel
+        self._running = False
+        while self._worker_alive:
+            _nap()
+        self.display._flush_buf = self.display.buffer
 
 
-class SSD1306_I2C(SSD1306):
-    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
-        self.i2c = i2c
-        self.addr = addr
-        self._tmp = bytearray(2)
-        super().__init__(width, height, external_vcc)
+def pgm_to_planes(path):
+    # 8-bit binary PGM (P5) -> (w, h, hi, lo), planes in MONO_VLSB page layout.
+    # Levels are v * 4 // (maxval + 1), so 0..63 black ... 192..255 white.
+    with open(path, "rb") as f:
+        data = f.read()
+    fields = []
+    pos = 0
+    while len(fields) < 4:
+        while data[pos] <= 32:  # whitespace
+            pos += 1
+        if data[pos] == ord("#"):
+            while data[pos] != ord("\n"):
+                pos += 1
+            continue
+        start = pos
+        while data[pos] > 32:
+            pos += 1
+        fields.append(data[start:pos])
+    if fields[0] != b"P5":
+        raise ValueError("Not P5 PGM")
+    w = int(fields[1])
+    h = int(fields[2])
+    scale = int(fields[3]) + 1
+    if scale > 256:
+        raise ValueError("16-bit PGM not supported")
+    pos += 1  # single whitespace after maxval
+    if len(data) - pos < w * h:
+        raise ValueError("PGM data truncated")
+    size = w * ((h + 7) // 8)
+    hi = bytearray(size)
+    lo = bytearray(size)
+    for y in range(h):
+        row = pos + y * w
+        base = (y >> 3) * w
+        bit = 1 << (y & 7)
+        for x in range(w):
+            level = data[row + x] * 4 // scale
+            if level & 2:
+                hi[base + x] |= bit
+            if level & 1:
+                lo[base + x] |= bit
+    return w, h, hi, lo
 
-    def write_cmd(self, cmd):
-        self._tmp[0] = 0x80
-        self._tmp[1] = cmd & 0xFF
-        self.i2c.writeto(self.addr, self._tmp)
 
-    def write_data(self, buf):
-        # ONE transaction; required by many clone panels
-        self.i2c.writeto(self.addr, b"\x40" + buf)
+def bench_gray(display, ms=2000):
+    # Unpaced: how many planes/s the flush path sustains with a full-screen
+    # 4-level ramp (every page differs between planes), plus flush times in us
+    g = Gray4(display)
+    for i in range(4):
+        g.fill_rect(i * display.width // 4, 0, display.width // 4, display.height, i)
+    g.step()  # warm-up
+    g.reset_timing()
+    t0 = ticks_us()
+    end = ticks_add(t0, ms * 1000)
+    while ticks_diff(end, ticks_us()) > 0:
+        g.step()
+    elapsed = ticks_diff(ticks_us(), t0)
+    g.stop()
+    result = g.timing()
+    result["rate"] = g.flushes * 1000000 // elapsed
+    return result
@@ -0,0 +1,10 @@
+# Host tests (CPython + pytest): python3 -m pytest -q tests
+# tests/ goes first on sys.path so the framebuf shim and the fakes are found,
+# then the repo root for the modules under test.
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
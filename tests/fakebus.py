@@ -0,0 +1,160 @@
+# fakebus.py
+# Host-side (CPython) stand-in for machine.I2C, for exercising the drivers and
+# i2ctune without a board, and FakePanel to check what reached the panel RAM.
+# Not used on the Pico.
+#
+#   bus = FakeI2C(freq=1000000, nack_above=800000)   # every write NACKs
+#   make_bus = FakeBusFactory(nack_above=800000)   # for i2ctune.probe()
+#   spi = FakeSPI(dc, cs)                           # dc/cs: fakepin.FakePin
+
+_EIO = 5  # what the rp2 port raises for a NACK
+
+
+class FakeI2C:
+    # Records every transaction (bytes, control byte first) in .log.
+    # While freq > nack_above each write raises OSError(EIO), like a panel
+    # that cannot keep up; change nack_above later to inject runtime errors.
+    def __init__(self, freq=400000, nack_above=None):
+        self.freq = freq
+        self.nack_above = nack_above
+        self.log = []
+        self.nacks = 0
+
+    def _check(self):
+        if self.nack_above is not None and self.freq > self.nack_above:
+            self.nacks += 1
+            raise OSError(_EIO)
+
+    def writeto(self, addr, buf, stop=True):
+        self._check()
+        self.log.append(bytes(buf))
+        return len(buf)
+
+    def writevto(self, addr, vec, stop=True):
+        self._check()
+        data = b"".join(bytes(v) for v in vec)
+        self.log.append(data)
+        return len(data)
+
+    def scan(self):
+        return [0x3C]
+
+
+class FakeBusFactory:
+    # make_bus(freq) -> FakeI2C for i2ctune; .buses lists every bus built and
+    # nack_above applies to buses built afterwards
+    def __init__(self, nack_above=None):
+        self.nack_above = nack_above
+        self.buses = []
+
+    def __call__(self, freq):
+        bus = FakeI2C(freq, self.nack_above)
+        self.buses.append(bus)
+        return bus
+
+
+class FakeSPI:
+    # Stand-in for machine.SPI on a 4-wire panel. Every write() is logged as
+    # (DC level, CS frame, bytes); the frame number counts CS falling edges
+    # (always 0 with cs=None).
+    def __init__(self, dc, cs=None):
+        self.dc = dc
+        self.cs = cs
+        self.log = []
+
+    def write(self, buf):
+        frame = 0
+        if self.cs is not None:
+            assert self.cs.value() == 0, "write outside a CS frame"
+            frame = self.cs.edges
+        self.log.append((self.dc.value(), frame, bytes(buf)))
+
+    def frames(self):
+        # CS frames as (DC level, bytes), writes inside one frame joined
+        out = []
+        last = None
+        for dc, frame, data in self.log:
+            if self.cs is not None and (dc, frame) == last:
+                out[-1] = (dc, out[-1][1] + data)
+            else:
+                out.append((dc, data))
+            last = (dc, frame)
+        return out
+
+    def as_i2c(self):
+        # The frames as I2C transactions (control byte first), for FakePanel
+        return [(b"\x40" if dc else b"\x00") + data for dc, data in self.frames()]
+
+
+# Argument count of the SSD1306 commands the drivers send
+_CMD_ARGS = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1, 0xD3: 1,
+             0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1, 0x26: 6, 0x27: 6, 0x29: 5,
+             0x2A: 5, 0xA3: 2, 0x2C: 6, 0x2D: 6}
+
+
+class FakePanel:
+    # Controller RAM rebuilt from the logged transactions: page and horizontal
+    # addressing, 132 columns. feed(bus.log) and compare with the framebuffer.
+    def __init__(self, cols=132, pages=8):
+        self.cols = cols
+        self.ram = [bytearray(cols) for _ in range(pages)]
+        self.mode = 2
+        self.page = 0
+        self.col = 0
+        self.win = [0, cols - 1, 0, pages - 1]
+        self._op = None
+        self._args = []
+
+    def feed(self, log):
+        for txn in log:
+            ctrl = txn[0]
+            if ctrl == 0x80:
+                self.cmd(txn[1])
+            elif ctrl == 0x00:
+                for c in txn[1:]:
+                    self.cmd(c)
+            elif ctrl == 0x40:
+                for b in txn[1:]:
+                    self.data(b)
+
+    def cmd(self, c):
+        if self._op is not None:
+            self._args.append(c)
+            if len(self._args) == _CMD_ARGS[self._op]:
+                op, a = self._op, self._args
+                self._op = None
+                if op == 0x20:
+                    self.mode = a[0]
+                elif op == 0x21:
+                    self.win[0:2] = a
+                    self.col = a[0]
+                elif op == 0x22:
+                    self.win[2:4] = a
+                    self.page = a[0]
+            return
+        if c in _CMD_ARGS:
+            self._op = c
+            self._args = []
+        elif self.mode == 2 and 0xB0 <= c <= 0xB7:
+            self.page = c - 0xB0
+        elif self.mode == 2 and c < 0x10:
+            self.col = (self.col & 0xF0) | c
+        elif self.mode == 2 and 0x10 <= c < 0x20:
+            self.col = (self.col & 0x0F) | ((c & 0x0F) << 4)
+
+    def data(self, b):
+        self.ram[self.page][self.col] = b
+        if self.mode == 2:
+            self.col = min(self.col + 1, self.cols - 1)
+            return
+        self.col += 1
+        if self.col > self.win[1]:
+            self.col = self.win[0]
+            self.page += 1
+            if self.page > self.win[3]:
+                self.page = self.win[2]
+
+    def shows(self, buf, width=128, offset=2):
+        # True if the visible columns hold buf (landscape MONO_VLSB pages)
+        return all(bytes(self.ram[p][offset:offset + width]) == bytes(buf[p * width:(p + 1) * width])
+                   for p in range(len(self.ram)))
@@ -0,0 +1,67 @@
+# fakepin.py
+# Host-side (CPython) stand-in for machine.Pin buttons, for exercising
+# inputq.Input (IRQ and polling paths) and the games without a board; also the
+# DC/CS/RES outputs of fakebus.FakeSPI. Not used on the Pico.
+#
+#   pins = [FakePin() for _ in range(4)]   # released (pull-up: 1)
+#   inp = inputq.Input(pins)
+#   pins[0].press(); pins[0].release()     # edges fire the IRQ handler
+#   pins[0].bounce(6)                      # contact chatter, ends pressed
+#   pins[1].set_quiet(0)                   # level change without an IRQ
+
+
+class FakePin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, level=1, irq=True):
+        self._level = level
+        self._irq_ok = irq   # False: like a port without Pin.irq
+        self._handler = None
+        self._trigger = 0
+        self.edges = 0
+
+    def init(self, mode=-1, pull=-1, value=None):
+        if value is not None:
+            self.set(value)
+
+    def value(self, v=None):
+        if v is None:
+            return self._level
+        self.set(v)
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        if not self._irq_ok:
+            raise AttributeError("irq")
+        self._handler = handler
+        self._trigger = trigger
+
+    def set(self, level):
+        if level == self._level:
+            return
+        self._level = level
+        self.edges += 1
+        want = self.IRQ_RISING if level else self.IRQ_FALLING
+        if self._handler is not None and self._trigger & want:
+            self._handler(self)
+
+    def set_quiet(self, level):
+        self._level = level
+
+    def press(self):
+        self.set(0)
+
+    def release(self):
+        self.set(1)
+
+    def bounce(self, n, end=0):
+        # n quick toggles, settling at end
+        for k in range(n):
+            self.set((end + n - k) & 1)
+        self.set(end)
@@ -0,0 +1,97 @@
+# framebuf.py
+# Host-side (CPython) stand-in for MicroPython's framebuf, enough for the
+# drivers and the tests: pixel-exact for MONO_VLSB / MONO_HLSB / MONO_HMSB
+# pixel, fill, lines and rectangles. text() draws a solid 5x6 block per
+# character instead of the font, scroll() does nothing. Slow; never copied to
+# the board (the firmware has the real module).
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+
+
+class FrameBuffer:
+    def __init__(self, buf, width, height, fmt, stride=None):
+        self.buf = buf
+        self.width = width
+        self.height = height
+        self.fmt = fmt
+        self.stride = stride or width
+
+    def _index(self, x, y):
+        if self.fmt == MONO_VLSB:
+            return (y >> 3) * self.stride + x, 1 << (y & 7)
+        if self.fmt == MONO_HLSB:
+            return (x + y * self.stride) >> 3, 0x80 >> (x & 7)
+        return (x + y * self.stride) >> 3, 1 << (x & 7)
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        i, m = self._index(x, y)
+        if c is None:
+            return 1 if self.buf[i] & m else 0
+        if c:
+            self.buf[i] |= m
+        else:
+            self.buf[i] &= ~m & 0xFF
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(0, y), min(self.height, y + h)):
+            for xx in range(max(0, x), min(self.width, x + w)):
+                self.pixel(xx, yy, c)
+
+    def fill(self, c):
+        if self.fmt == MONO_VLSB and self.stride == self.width:
+            v = 0xFF if c else 0
+            for i in range(self.width * ((self.height + 7) >> 3)):
+                self.buf[i] = v
+        else:
+            self.fill_rect(0, 0, self.width, self.height, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def line(self, x0, y0, x1, y1, c):
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        e = dx + dy
+        while True:
+            self.pixel(x0, y0, c)
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * e
+            if e2 >= dy:
+                e += dy
+                x0 += sx
+            if e2 <= dx:
+                e += dx
+                y0 += sy
+
+    def text(self, s, x, y, c=1):
+        for i in range(len(s)):
+            self.fill_rect(x + i * 8 + 1, y + 1, 5, 6, c)
+
+    def scroll(self, dx, dy):
+        pass
+
+    def blit(self, fb, x, y, key=-1, palette=None):
+        for yy in range(fb.height):
+            for xx in range(fb.width):
+                v = fb.pixel(xx, yy)
+                if v != key:
+                    self.pixel(x + xx, y + yy, v)
@@ -0,0 +1,16 @@
+import time
+
+import ssd1306
+from fakebus import FakeI2C
+
+
+def test_start_stop_worker():
+    d = ssd1306.SSD1306_I2C(128, 64, FakeI2C())
+    g = ssd1306.Gray4(d)
+    g.fill_rect(0, 0, 16, 16, 2)
+    g.start(rate=2000)
+    time.sleep(0.02)
+    g.stop()
+    assert not g._worker_alive
+    assert g.flushes > 0
+    assert d._flush_buf is d.buffer
@@ -0,0 +1,92 @@
+import heaplog
+import ssd1306
+from fakebus import FakeI2C
+
+
+class Heap:
+    # mem_alloc/mem_free stand-ins; allocations above `block` fail
+    def __init__(self, free=8000, alloc=2000, block=None):
+        self.free = free
+        self.alloc = alloc
+        self.block = free if block is None else block
+
+    def mem_free(self):
+        return self.free
+
+    def mem_alloc(self):
+        return self.alloc
+
+    def bytearray(self, n):
+        if n > self.block:
+            raise MemoryError
+        return bytearray(n)
+
+
+def use(monkeypatch, heap):
+    monkeypatch.setattr(heaplog, "mem_free", heap.mem_free)
+    monkeypatch.setattr(heaplog, "mem_alloc", heap.mem_alloc)
+    monkeypatch.setattr(heaplog, "bytearray", heap.bytearray, raising=False)
+    monkeypatch.setattr(heaplog.gc, "collect", lambda: None)
+
+
+def test_largest_block_bisects_to_the_grain(monkeypatch):
+    use(monkeypatch, Heap(free=8000, block=3000))
+    assert heaplog.largest_block() == 3000 // heaplog.GRAIN * heaplog.GRAIN
+    use(monkeypatch, Heap(free=8000))
+    assert heaplog.largest_block() == 8000
+    use(monkeypatch, Heap(free=8000, block=0))
+    assert heaplog.largest_block() == 0
+
+
+def test_snapshot_fragmentation(monkeypatch):
+    use(monkeypatch, Heap(free=8000, alloc=1234, block=2000))
+    snap = heaplog.snapshot()
+    assert snap["free"] == 8000 and snap["alloc"] == 1234
+    assert snap["block"] == 2000
+    assert abs(snap["frag"] - 0.75) < 1e-9
+    use(monkeypatch, Heap(free=0))
+    assert heaplog.snapshot()["frag"] == 0.0
+
+
+def test_peak_is_sampled_per_flush_and_wrappers_removed(monkeypatch):
+    heap = Heap()
+    use(monkeypatch, heap)
+    d = ssd1306.SSD1306_I2C(128, 64, FakeI2C())
+    log = heaplog.HeapLog()
+    log.before("pong", d)
+    heap.alloc = 5000
+    d.show(True)
+    heap.alloc = 3000
+    d.show_region(0, 0, 8, 8)
+    assert d.present() is True
+    heap.alloc = 2100
+    run = log.after("pong")
+    assert run["peak"] == 5000
+    assert run["after"]["alloc"] == 2100
+    for name in heaplog.HeapLog._WATCHED:
+        assert name not in d.__dict__
+    assert "leak" in log.line("pong", run)
+
+
+def test_instance_wrappers_are_put_back(monkeypatch):
+    use(monkeypatch, Heap())
+    d = ssd1306.SSD1306_I2C(128, 64, FakeI2C())
+    d.enable_stats()
+    stats_show = d.show
+    log = heaplog.HeapLog()
+    log.before("pong", d)
+    assert d.show is not stats_show
+    d.show()
+    log.after("pong")
+    assert d.show is stats_show
+    assert "present" not in d.__dict__  # enable_stats() does not wrap it
+
+
+def test_history_is_bounded(monkeypatch):
+    use(monkeypatch, Heap())
+    log = heaplog.HeapLog(history=2)
+    for _ in range(3):
+        log.before("pong")
+        log.after("pong")
+    assert len(log.runs["pong"]) == 2
+    assert log.after("pong") is None  # no run in progress
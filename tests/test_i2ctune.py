@@ -0,0 +1,132 @@
+import pytest
+
+import i2ctune
+import ssd1306
+from fakebus import FakeI2C, FakeBusFactory, FakePanel
+
+
+class Glitchy(FakeI2C):
+    # Fails the next `fails` transactions, then behaves
+    def __init__(self, freq=400000, fails=0):
+        FakeI2C.__init__(self, freq)
+        self.fails = fails
+
+    def _check(self):
+        if self.fails:
+            self.fails -= 1
+            self.nacks += 1
+            raise OSError(5)
+
+
+def test_probe_stops_at_first_failing_rate():
+    make_bus = FakeBusFactory(nack_above=800000)
+    assert i2ctune.probe(make_bus) == 800000
+    assert [b.freq for b in make_bus.buses] == [400000, 800000, 1000000]
+
+
+def test_probe_falls_back_to_safe_rate():
+    assert i2ctune.probe(FakeBusFactory(nack_above=0)) == i2ctune.SAFE_RATE
+
+
+def test_open_tuned_probes_once(tmp_path):
+    path = str(tmp_path / "profile.txt")
+    make_bus = FakeBusFactory(nack_above=800000)
+    bus = i2ctune.open_tuned(make_bus, path=path)
+    assert bus.freq == 800000
+    assert i2ctune.load(path) == 800000
+    n = len(make_bus.buses)
+    i2ctune.open_tuned(make_bus, path=path)
+    assert len(make_bus.buses) == n + 1  # just the bus itself, no probing
+
+
+def test_one_off_error_reaches_the_driver_at_the_same_rate(tmp_path):
+    path = str(tmp_path / "profile.txt")
+    i2ctune.save(1000000, path)
+    buses = []
+
+    def make_bus(freq):
+        buses.append(Glitchy(freq, fails=i2ctune.STRIKES - 1))
+        return buses[-1]
+
+    bus = i2ctune.TunedI2C(make_bus, 1000000, path=path)
+    for _ in range(i2ctune.STRIKES - 1):
+        with pytest.raises(OSError):
+            bus.writeto(0x3C, b"\x40\x01")
+    assert bus.writeto(0x3C, b"\x40\x01") == 2
+    assert bus.freq == 1000000 and bus.fallbacks == 0
+    assert bus.errors == i2ctune.STRIKES - 1
+    assert i2ctune.load(path) == 1000000
+    assert len(buses) == 1
+
+
+def test_repeated_errors_step_down_and_save(tmp_path):
+    path = str(tmp_path / "profile.txt")
+    make_bus = FakeBusFactory(nack_above=800000)
+    bus = i2ctune.TunedI2C(make_bus, 1000000, path=path)
+    for _ in range(i2ctune.STRIKES):
+        with pytest.raises(OSError):
+            bus.writevto(0x3C, [b"\x40", b"\x01\x02"])
+    assert bus.freq == 800000 and bus.fallbacks == 1
+    assert i2ctune.load(path) == 800000
+    assert bus.writevto(0x3C, [b"\x40", b"\x01\x02"]) == 3
+    assert make_bus.buses[-1].log == [b"\x40\x01\x02"]
+
+
+def test_safe_rate_error_reaches_the_caller(tmp_path):
+    path = str(tmp_path / "profile.txt")
+    bus = i2ctune.TunedI2C(FakeBusFactory(nack_above=0), 400000, path=path)
+    for _ in range(bus.retries + 1):
+        with pytest.raises(OSError):
+            bus.writeto(0x3C, b"\x40\x00")
+    assert bus.freq == i2ctune.SAFE_RATE
+
+
+def test_set_rate_keeps_the_profile(tmp_path):
+    path = str(tmp_path / "profile.txt")
+    i2ctune.save(1000000, path)
+    make_bus = FakeBusFactory(nack_above=400000)
+    bus = i2ctune.TunedI2C(make_bus, 1000000, path=path)
+    bus.set_rate(800000)  # a game's own rate; it NACKs, so it falls back
+    for _ in range(i2ctune.STRIKES):
+        with pytest.raises(OSError):
+            bus.writeto(0x3C, b"\x40\x00")
+    assert bus.writeto(0x3C, b"\x40\x00") == 2
+    assert bus.freq == 400000 and bus.fallbacks == 1
+    assert i2ctune.load(path) == 1000000  # nothing saved while moved
+    make_bus.nack_above = None
+    bus.set_rate()
+    assert bus.freq == 1000000 and make_bus.buses[-1].freq == 1000000
+
+
+class Partial(FakeI2C):
+    # Like an rp2 EIO halfway through a transfer: the first `keep` bytes of
+    # the next `fails` data writes reach the panel, then the write fails
+    def __init__(self, freq=400000, fails=0, keep=40):
+        FakeI2C.__init__(self, freq)
+        self.fails = fails
+        self.keep = keep
+
+    def writeto(self, addr, buf, stop=True):
+        if self.fails and buf[0] == 0x40:
+            self.fails -= 1
+            self.nacks += 1
+            self.log.append(bytes(buf[:self.keep]))
+            raise OSError(5)
+        return FakeI2C.writeto(self, addr, buf, stop)
+
+
+def test_partial_write_is_readdressed_and_resent(tmp_path):
+    path = str(tmp_path / "profile.txt")
+    raw = Partial(1000000)
+    bus = i2ctune.TunedI2C(lambda freq: raw, 1000000, path=path)
+    d = ssd1306.SSD1306_I2C(128, 64, bus)
+    assert d.bus_retries == bus.retries
+    d.show()
+    raw.fails = 2
+    d.fill(0)
+    d.text("partial", 0, 20)
+    d.show()
+    assert raw.fails == 0 and bus.errors == 2
+    panel = FakePanel()
+    panel.feed(raw.log)
+    assert panel.shows(d.buffer)  # no page left shifted by the broken write
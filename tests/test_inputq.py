@@ -0,0 +1,114 @@
+import inputq
+from fakepin import FakePin
+
+
+class Clock:
+    # Stand-in for ticks_us/ticks_ms, moved by hand
+    def __init__(self):
+        self.us = 1000000
+
+    def ticks_us(self):
+        return self.us
+
+    def ticks_ms(self):
+        return self.us // 1000
+
+    def advance(self, us):
+        self.us += us
+
+
+def setup(monkeypatch, irq=True):
+    clock = Clock()
+    monkeypatch.setattr(inputq, "ticks_us", clock.ticks_us)
+    monkeypatch.setattr(inputq, "ticks_ms", clock.ticks_ms)
+    pins = [FakePin(irq=irq) for _ in range(4)]
+    return inputq.Input(pins, irq=irq), pins, clock
+
+
+def drain(inp):
+    evs = []
+    while True:
+        ev = inp.get()
+        if ev < 0:
+            return evs
+        evs.append((inputq.button(ev), inputq.is_press(ev)))
+
+
+def test_press_and_release_events(monkeypatch):
+    inp, pins, clock = setup(monkeypatch)
+    assert inp.irq
+    pins[inputq.RIGHT].press()
+    clock.advance(20000)
+    pins[inputq.RIGHT].release()
+    assert drain(inp) == [(inputq.RIGHT, 1), (inputq.RIGHT, 0)]
+
+
+def test_bounce_gives_one_press(monkeypatch):
+    inp, pins, clock = setup(monkeypatch)
+    pins[inputq.UP].bounce(6)  # all within the debounce window
+    assert drain(inp) == [(inputq.UP, 1)]
+    assert inp.held(inputq.UP)
+
+
+def test_bounce_ending_released_is_settled_by_get(monkeypatch):
+    inp, pins, clock = setup(monkeypatch)
+    pins[inputq.DOWN].press()
+    pins[inputq.DOWN].release()  # dropped as bounce by the handler
+    assert inp.held(inputq.DOWN)
+    clock.advance(inputq.DEBOUNCE_US)
+    assert drain(inp) == [(inputq.DOWN, 1), (inputq.DOWN, 0)]
+
+
+def test_polling_fallback(monkeypatch):
+    inp, pins, clock = setup(monkeypatch, irq=False)
+    assert not inp.irq
+    pins[inputq.LEFT].set_quiet(0)
+    assert drain(inp) == [(inputq.LEFT, 1)]
+
+
+def test_short_tap_is_seen_once_by_value(monkeypatch):
+    inp, pins, clock = setup(monkeypatch)
+    b = inp.buttons[inputq.UP]
+    pins[inputq.UP].press()
+    clock.advance(20000)
+    pins[inputq.UP].release()
+    assert b.value() == 0  # pressed and released before anyone looked
+    assert b.value() == 1
+
+
+def test_full_ring_drops_and_clear(monkeypatch):
+    inp, pins, clock = setup(monkeypatch)
+    for _ in range(inputq.SIZE):
+        pins[0].press()
+        clock.advance(20000)
+        pins[0].release()
+        clock.advance(20000)
+    assert inp.dropped > 0
+    inp.clear()
+    assert inp.get() == -1
+    assert inp.buttons[0].value() == 1
+
+
+def test_launch_press_read_by_get_is_cleared(monkeypatch):
+    # The menu launches on a DOWN event from get(); the press stays latched
+    # for Button.value() until clear(), which launch_game() calls before
+    # handing the buttons to the game
+    inp, pins, clock = setup(monkeypatch)
+    pins[inputq.DOWN].press()
+    assert drain(inp) == [(inputq.DOWN, 1)]
+    clock.advance(20000)
+    pins[inputq.DOWN].release()
+    clock.advance(500000)
+    inp.get()
+    assert inp._latch[inputq.DOWN]
+    inp.clear()
+    assert inp.buttons[inputq.DOWN].value() == 1
+    assert inp.get() == -1
+
+
+def test_clear_keeps_a_button_still_held(monkeypatch):
+    inp, pins, clock = setup(monkeypatch)
+    pins[inputq.UP].press()
+    inp.get()
+    inp.clear()
+    assert inp.buttons[inputq.UP].value() == 0  # held is held, not a stale press
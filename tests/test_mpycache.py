@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+import mpycache
+
+
+@pytest.fixture
+def games(tmp_path, monkeypatch):
+    monkeypatch.setattr(mpycache, "_cross", "")  # no mpy-cross: never rebuilds
+    folder = str(tmp_path)
+    with open(folder + "/pong.py", "w") as f:
+        f.write("SPEED = 1\n")
+    os.mkdir(folder + "/" + mpycache.DIR)
+    return folder
+
+
+def fake_build(folder, name):
+    # An .mpy plus the stamp compile_game() would write
+    open(mpycache._path(folder, name + ".mpy"), "wb").close()
+    src = "%s/%s.py" % (folder, name)
+    stamps = mpycache.load_stamps(folder)
+    stamps[name] = [os.stat(src)[6], mpycache.source_crc(src), 0]
+    mpycache.save_stamps(folder, stamps)
+
+
+def test_stamped_mpy_is_used_until_the_source_changes(games):
+    fake_build(games, "pong")
+    assert mpycache.prepare(games, "pong") == "mpy"
+    with open(games + "/pong.py", "w") as f:
+        f.write("SPEED = 2\n")  # same size, other CRC
+    os.utime(games + "/pong.py", (0, 1))
+    assert mpycache.prepare(games, "pong") == "py"
+    assert not os.path.exists(mpycache._path(games, "pong.mpy"))
+    assert "pong" not in mpycache.load_stamps(games)
+
+
+def test_unstamped_mpy_next_to_a_source_is_deleted(games):
+    open(mpycache._path(games, "pong.mpy"), "wb").close()
+    assert mpycache.prepare(games, "pong") == "py"
+    assert not os.path.exists(mpycache._path(games, "pong.mpy"))
+
+
+def test_mpy_without_source_is_kept(games):
+    open(mpycache._path(games, "solo.mpy"), "wb").close()
+    assert mpycache.prepare(games, "solo") == "mpy"
+
+
+def test_without_crc32_size_decides(games, monkeypatch):
+    fake_build(games, "pong")  # stamped with the real CRC
+    monkeypatch.setattr(mpycache, "crc32", None)
+    os.utime(games + "/pong.py", (0, 1))  # mtime no longer settles it
+    assert mpycache.prepare(games, "pong") == "mpy"
+    with open(games + "/pong.py", "w") as f:
+        f.write("SPEED = 10\n")
+    assert mpycache.prepare(games, "pong") == "py"
+
+
+def test_load_imports_the_source(games, monkeypatch):
+    monkeypatch.setattr(sys, "path", [games] + sys.path)
+    mod, kind, us = mpycache.load(games, "pong")
+    sys.modules.pop("pong", None)
+    assert kind == "py" and mod.SPEED == 1
@@ -0,0 +1,156 @@
+import time
+
+import pytest
+
+import ssd1306
+from fakebus import FakeI2C, FakePanel
+
+
+def make(**kw):
+    bus = FakeI2C()
+    return ssd1306.SSD1306_I2C(128, 64, bus, **kw), bus
+
+
+def data_txns(log):
+    return [t for t in log if t[0] == 0x40]
+
+
+def test_first_show_sends_every_page_in_full():
+    d, bus = make()
+    n = len(bus.log)
+    d.text("hi", 0, 0)
+    d.show()
+    sent = data_txns(bus.log[n:])
+    assert len(sent) == 8
+    assert all(len(t) == 1 + 132 for t in sent)
+    panel = FakePanel()
+    panel.feed(bus.log)
+    assert panel.shows(d.buffer)
+
+
+def test_show_sends_only_the_changed_run():
+    d, bus = make()
+    d.show()
+    n = len(bus.log)
+    d.show()
+    assert bus.log[n:] == []  # nothing changed, nothing sent
+    d.fill_rect(40, 20, 5, 3, 1)  # page 2, columns 40..44
+    d.show()
+    sent = data_txns(bus.log[n:])
+    assert len(sent) == 1
+    assert len(sent[0]) == 1 + 5
+    panel = FakePanel()
+    panel.feed(bus.log)
+    assert panel.shows(d.buffer)
+
+
+def test_force_resends_all_pages():
+    d, bus = make()
+    d.show()
+    n = len(bus.log)
+    d.show(force=True)
+    assert len(data_txns(bus.log[n:])) == 8
+
+
+def test_horizontal_mode_matches_page_mode():
+    d, bus = make(addr_mode=ssd1306.ADDR_HORIZONTAL, full_ram=False, burst_pages=2)
+    d.text("hi", 10, 50)
+    d.show()
+    d.pixel(100, 3, 1)
+    d.show()
+    panel = FakePanel()
+    panel.feed(bus.log)
+    assert panel.shows(d.buffer)
+
+
+def test_async_present_and_sync():
+    d, bus = make()
+    d.start_async()
+    try:
+        for i in range(4):
+            d.fill_rect(i * 10, i * 8, 8, 8, 1)
+            assert d.present()
+        d.sync()
+        assert d.frames_presented == 4
+        panel = FakePanel()
+        panel.feed(bus.log)
+        assert panel.shows(d.buffer)  # the back buffer is a copy of the last frame
+    finally:
+        d.stop_async()
+    assert not d._async
+
+
+def test_async_bus_error_is_recorded_and_resent():
+    d, bus = make()
+    d.start_async()
+    try:
+        bus.nack_above = 0
+        d.fill_rect(0, 0, 16, 16, 1)
+        d.present()
+        d.sync()  # the worker carries on after a bus error
+        assert isinstance(d.async_error, OSError)
+        bus.nack_above = None
+        d.present()
+        d.sync()
+        panel = FakePanel()
+        panel.feed(bus.log)
+        assert panel.shows(d.buffer)
+    finally:
+        d.stop_async()
+
+
+class Broken(Exception):
+    pass
+
+
+def test_async_worker_exception_is_raised_not_hung():
+    d, bus = make()
+    good = bus.writeto
+
+    def bad(addr, buf, stop=True):
+        raise Broken()
+
+    d.start_async()
+    bus.writeto = bad
+    d.fill(1)
+    d.present()
+    with pytest.raises(Broken):
+        d.sync()
+    assert not d._async  # back to blocking show()
+    bus.writeto = good
+    d.show()
+    panel = FakePanel()
+    panel.feed(bus.log)
+    assert panel.shows(d.buffer)
+
+
+def test_present_after_worker_died_raises():
+    d, bus = make()
+
+    def bad(addr, buf, stop=True):
+        raise Broken()
+
+    d.start_async(ssd1306.PRESENT_DROP)
+    bus.writeto = bad
+    d.fill(1)
+    d.present()
+    while d._worker_alive:
+        time.sleep(0.001)
+    with pytest.raises(Broken):
+        d.present()
+    d.stop_async()  # already stopped: no hang, no error
+
+
+def test_restore_after_hw_scroll_resends_every_page():
+    d, bus = make()
+    d.show()
+    d.set_rotation(90)
+    d.hw_scroll_start(page0=2, page1=5)
+    d.restore()
+    n = len(bus.log)
+    d.fill(1)
+    d.show()
+    assert len(data_txns(bus.log[n:])) == 8
+    panel = FakePanel()
+    panel.feed(bus.log)
+    assert panel.shows(d.buffer)
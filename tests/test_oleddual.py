@@ -0,0 +1,80 @@
+import pytest
+
+import oleddual
+import ssd1306
+from fakebus import FakeI2C, FakePanel
+
+
+def pair(layout, parallel=None, shared=False):
+    bus_a = FakeI2C()
+    bus_b = bus_a if shared else FakeI2C()
+    a = ssd1306.SSD1306_I2C(128, 64, bus_a)
+    b = ssd1306.SSD1306_I2C(128, 64, bus_b, addr=0x3D)
+    return oleddual.DualDisplay(a, b, layout, parallel), bus_a, bus_b
+
+
+def ram(bus):
+    panel = FakePanel()
+    panel.feed(bus.log)
+    return panel
+
+
+def test_stack_split():
+    d, bus_a, bus_b = pair(oleddual.STACK)
+    assert d.parallel
+    try:
+        d.fill_rect(10, 60, 4, 8, 1)  # straddles the two panels
+        d.show()
+        a, b = d.panels
+        assert ram(bus_a).shows(a.buffer)
+        assert ram(bus_b).shows(b.buffer)
+        assert a.buffer[7 * 128 + 10] == 0xF0  # rows 60..63
+        assert b.buffer[13] == 0x0F            # rows 64..67
+    finally:
+        d.stop()
+
+
+def test_side_split():
+    d, bus_a, bus_b = pair(oleddual.SIDE)
+    try:
+        d.pixel(127, 5, 1)
+        d.pixel(200, 40, 1)
+        d.show()
+        a, b = d.panels
+        assert a.buffer[127] == 1 << 5
+        assert b.buffer[5 * 128 + 72] == 1      # x 200 -> column 72 of b
+        assert ram(bus_a).shows(a.buffer)
+        assert ram(bus_b).shows(b.buffer)
+    finally:
+        d.stop()
+
+
+class Broken(Exception):
+    pass
+
+
+def test_failing_second_panel_raises_in_show():
+    d, bus_a, bus_b = pair(oleddual.STACK)
+    good = bus_b.writeto
+
+    def bad(addr, buf, stop=True):
+        raise Broken()
+
+    try:
+        bus_b.writeto = bad
+        d.fill(1)
+        with pytest.raises(Broken):
+            d.show()
+        bus_b.writeto = good
+        d.show()  # b was invalidated: everything resent
+        assert ram(bus_b).shows(d.panels[1].buffer)
+    finally:
+        d.stop()
+
+
+def test_one_bus_flushes_in_turn():
+    d, bus_a, bus_b = pair(oleddual.STACK, shared=True)
+    assert not d.parallel
+    d.text("hi", 0, 100)
+    d.show()
+    assert not d._worker_alive
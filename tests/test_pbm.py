@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+import pbm
+
+
+def image(w, h, rnd):
+    return bytearray(rnd.getrandbits(8) for _ in range(((w + 7) >> 3) * h))
+
+
+def reference(data, w, h, dst, dw, dh, x0, y0):
+    # the per-pixel loop blit_p4() replaced, with clipping
+    rb = (w + 7) >> 3
+    for y in range(h):
+        for x in range(w):
+            dx = x0 + x
+            dy = y0 + y
+            if 0 <= dx < dw and 0 <= dy < dh:
+                if (data[y * rb + (x >> 3)] >> (7 - (x & 7))) & 1:
+                    dst[(dy >> 3) * dw + dx] |= 1 << (dy & 7)
+
+
+def check(data, w, h, dw, dh, x0, y0, rnd):
+    # non-empty destination: blit_p4() ORs, it never clears
+    base = bytearray(rnd.getrandbits(8) & rnd.getrandbits(8) for _ in range(dw * (dh >> 3)))
+    got = bytearray(base)
+    want = bytearray(base)
+    pbm.blit_p4(data, w, h, got, dw, dh, x0, y0)
+    reference(data, w, h, want, dw, dh, x0, y0)
+    assert got == want, (w, h, dw, dh, x0, y0)
+
+
+def test_matches_per_pixel_on_random_sizes_and_offsets():
+    rnd = random.Random(1234)
+    for _ in range(300):
+        w = rnd.randint(1, 40)
+        h = rnd.randint(1, 40)
+        dw = rnd.randint(1, 48)
+        dh = 8 * rnd.randint(1, 5)
+        x0 = rnd.randint(-w - 4, dw + 4)
+        y0 = rnd.randint(-h - 4, dh + 4)
+        check(image(w, h, rnd), w, h, dw, dh, x0, y0, rnd)
+
+
+@pytest.mark.parametrize("x0, y0", [
+    (-30, 0), (128, 0), (0, -30), (0, 64), (-30, -30), (200, 100),
+])
+def test_fully_clipped_leaves_the_destination_alone(x0, y0):
+    rnd = random.Random(7)
+    check(bytearray(b"\xff" * 4 * 30), 30, 30, 128, 64, x0, y0, rnd)
+
+
+@pytest.mark.parametrize("y0", [-1, -3, -7])
+def test_block_starting_above_the_top_edge(y0):
+    # the first 8-row block maps to page -1: only its lower part is drawn
+    rnd = random.Random(y0)
+    for w, h in ((8, 8), (13, 5), (20, 17)):
+        check(image(w, h, rnd), w, h, 32, 16, rnd.randint(-3, 3), y0, rnd)
+
+
+@pytest.mark.parametrize("w, h", [(9, 3), (15, 11), (17, 1), (1, 9), (31, 23)])
+def test_partial_last_block(w, h):
+    # width and height not multiples of 8: padding bits in the last byte of
+    # each row and the short last block of rows are never drawn
+    rnd = random.Random(w * 100 + h)
+    data = bytearray(b"\xff" * (((w + 7) >> 3) * h))
+    for x0, y0 in ((0, 0), (3, 5), (-2, -3), (20, 10)):
+        check(data, w, h, 40, 24, x0, y0, rnd)
+
+
+def test_read_p4(tmp_path):
+    path = tmp_path / "a.pbm"
+    path.write_bytes(b"P4\n# comment\n10 2\n" + b"\xff\xc0\x80\x40")
+    assert pbm.read_p4(str(path)) == (10, 2, bytearray(b"\xff\xc0\x80\x40"))
+    path.write_bytes(b"P4\n10 2\n\xff")
+    with pytest.raises(ValueError):
+        pbm.read_p4(str(path))
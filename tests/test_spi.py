@@ -0,0 +1,64 @@
+import sh1106
+import ssd1306
+from fakebus import FakeSPI, FakePanel
+from fakepin import FakePin
+
+
+def make(cls=ssd1306.SSD1306_SPI, **kw):
+    dc, res, cs = FakePin(), FakePin(), FakePin()
+    spi = FakeSPI(dc, cs)
+    return cls(128, 64, spi, dc, res, cs, **kw), spi, res
+
+
+def test_reset_pulse_and_init():
+    d, spi, res = make()
+    assert res.value() == 1 and res.edges >= 2  # pulsed low, released
+    assert spi.frames()[0][0] == 0              # init sequence goes out as commands
+    assert spi.frames()[0][1][0] == 0xAE
+
+
+def test_page_writes_are_one_frame_each():
+    d, spi, res = make()
+    n = len(spi.frames())
+    d.text("hi", 0, 0)
+    d.show()
+    data = [f for f in spi.frames()[n:] if f[0] == 1]
+    assert len(data) == 8
+    assert all(len(f[1]) == 132 for f in data)  # no 0x40 control byte on SPI
+    panel = FakePanel()
+    panel.feed(spi.as_i2c())
+    assert panel.shows(d.buffer)
+
+
+def test_horizontal_burst_is_one_frame():
+    d, spi, res = make(addr_mode=ssd1306.ADDR_HORIZONTAL)
+    n = len(spi.frames())
+    d.fill_rect(0, 0, 30, 30, 1)
+    d.show()
+    data = [f for f in spi.frames()[n:] if f[0] == 1]
+    assert [len(f[1]) for f in data] == [8 * 132]
+    panel = FakePanel()
+    panel.feed(spi.as_i2c())
+    assert panel.shows(d.buffer)
+
+
+def test_stats_count_data_bytes_without_control_byte():
+    d, spi, res = make()
+    d.show()
+    d.enable_stats()
+    d.reset_stats()
+    d.fill_rect(40, 20, 5, 3, 1)
+    d.show()
+    st = d.stats()
+    assert st["data_bytes"] == 5
+    assert st["cmd_bytes"] == 3
+    d.enable_stats(False)
+
+
+def test_sh1106_spi():
+    d, spi, res = make(sh1106.SH1106_SPI)
+    d.pixel(0, 0, 1)
+    d.show()
+    panel = FakePanel()
+    panel.feed(spi.as_i2c())
+    assert panel.shows(d.buffer)